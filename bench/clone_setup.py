@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+'''
+Benchmark: fresh-runner setup time for the clone strategies in show/clone_strategy.py.
+
+Builds a synthetic "tt-mlir" origin with lots of file content, then for each strategy measures a
+fresh clone, its size on disk, and reading third_party/CMakeLists.txt at every commit (what
+uplift_history.py does), with git's lazy per-blob fetches vs one prefetch_paths() request.
+
+The origin is served over file:// (upload-pack with filters enabled), so there is no network
+latency: on a real runner every lazy fetch is also a round trip to GitHub, and the gap between
+"lazy" and "prefetch" is much larger.
+
+Usage:
+    ./bench/clone_setup.py [--commits 200] [--files 400] [--lines-per-file 100]
+'''
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import git
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "show"))
+import clone_strategy
+import pinned_versions
+
+
+def build_origin(path, n_commits, n_files, lines_per_file):
+    """
+    Bare origin where every commit rewrites a slice of n_files source files and every 4th bumps TT_METAL_VERSION.
+    """
+    subprocess.run(["git", "init", "-q", "--bare", "-b", "main", path], check=True)
+    for key in ["uploadpack.allowFilter", "uploadpack.allowAnySHA1InWant"]:
+        subprocess.run(["git", "-C", path, "config", key, "true"], check=True)
+    stream = []
+    for i in range(n_commits):
+        stream.append(f"commit refs/heads/main\nmark :{i + 1}\ncommitter Bench <bench@example.com> {1700000000 + i} +0000\n")
+        msg = f"commit {i}\n"
+        stream.append(f"data {len(msg)}\n{msg}")
+        if i % 4 == 0:
+            cmake = f'set(TT_METAL_VERSION "{i:040x}")\n'
+            stream.append(f"M 100644 inline third_party/CMakeLists.txt\ndata {len(cmake)}\n{cmake}\n")
+        touched = range(n_files) if i == 0 else range(i % 10, n_files, 10)
+        for f in touched:
+            body = "".join(f"// file {f} line {l} rev {i}\n" for l in range(lines_per_file))
+            stream.append(f"M 100644 inline lib/file{f}.cpp\ndata {len(body.encode())}\n{body}\n")
+    subprocess.run(["git", "-C", path, "fast-import", "--quiet"], input="".join(stream).encode(), check=True)
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def read_all_pins(repo_path):
+    repo = git.Repo(repo_path)
+    pins = [pinned_versions.get_pinned_version(c, pinned_versions.CMAKELISTS_PATH, "TT_METAL_VERSION")
+            for c in repo.iter_commits("main")]
+    repo.close()
+    return pins
+
+
+def run_case(origin, workdir, name, strategy, sparse, prefetch):
+    clone_strategy.configure(strategy, sparse)
+    path = os.path.join(workdir, name)
+    start = time.perf_counter()
+    clone_strategy.clone(f"file://{origin}", path, "tt-mlir", capture_output=True)
+    clone_time = time.perf_counter() - start
+    size = dir_size(path)
+    start = time.perf_counter()
+    if prefetch:
+        clone_strategy.prefetch_paths(path, ["main"], [pinned_versions.CMAKELISTS_PATH])
+    pins = read_all_pins(path)
+    read_time = time.perf_counter() - start
+    return name, clone_time, size, read_time, pins
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fresh clone + pin reading for each clone strategy")
+    parser.add_argument("--commits", type=int, default=200)
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--lines-per-file", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        origin = os.path.join(tmp, "origin.git")
+        print(f"Building synthetic origin: {args.commits} commits, {args.files} files x {args.lines_per_file} lines...")
+        build_origin(origin, args.commits, args.files, args.lines_per_file)
+        cases = [
+            ("full", "full", False, False),
+            ("blobless+sparse, lazy", "blobless", True, False),
+            ("blobless+sparse, prefetch", "blobless", True, True),
+        ]
+        results = [run_case(origin, tmp, *case) for case in cases]
+
+    if any(r[4] != results[0][4] for r in results):
+        print("ERROR: strategies read different pins")
+        return 1
+
+    print(f"{'strategy':<28} | {'clone (s)':>9} | {'size (MB)':>9} | {'read pins (s)':>13} | {'total (s)':>9}")
+    print("-" * 82)
+    for name, clone_time, size, read_time, _ in results:
+        print(f"{name:<28} | {clone_time:>9.2f} | {size / 1e6:>9.1f} | {read_time:>13.2f} | {clone_time + read_time:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+'''
+Benchmark: extracting TT_METAL_VERSION bumps from tt-mlir commits.
+
+Compares the previous approach (full patch diff of every commit, keep only third_party/CMakeLists.txt)
+against the path-restricted lookup in show/pinned_versions.py, on a synthetic repo whose uplift
+commits touch many files, like real tt-mlir uplifts do.
+
+Usage:
+    ./bench/uplift_extract.py [--commits 60] [--files-per-commit 300] [--lines-per-file 200]
+'''
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import git
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "show"))
+import pinned_versions
+
+
+def diff_based_metal_change(commit):
+    """
+    The approach uplift_history.py used before pinned_versions.py: full patch diff, then parse one file.
+    """
+    diff = commit.diff(commit.parents[0] if commit.parents else None, create_patch=True)
+    before_hash = None
+    after_hash = None
+    for d in diff:
+        if d.a_path and "third_party/CMakeLists.txt" in d.a_path:
+            for line in d.diff.decode().splitlines():
+                if line.startswith("-set(TT_METAL_VERSION "):
+                    before_hash = line.split('"')[1]
+                if line.startswith("+set(TT_METAL_VERSION "):
+                    after_hash = line.split('"')[1]
+    return (before_hash, after_hash)
+
+
+def path_based_metal_change(commit):
+    return pinned_versions.get_version_change(commit, pinned_versions.CMAKELISTS_PATH, "TT_METAL_VERSION")
+
+
+def build_repo(path, n_commits, files_per_commit, lines_per_file):
+    """
+    Build a repo where every other commit is a "large uplift": bumps TT_METAL_VERSION and rewrites many files.
+    Commits are written with git fast-import so setup doesn't dominate the benchmark.
+    """
+    subprocess.run(["git", "init", "-q", "-b", "main", path], check=True)
+    stream = []
+    for i in range(n_commits):
+        stream.append(f"commit refs/heads/main\nmark :{i + 1}\ncommitter Bench <bench@example.com> {1700000000 + i} +0000\n")
+        msg = f"commit {i}\n"
+        stream.append(f"data {len(msg)}\n{msg}")
+        if i == 0 or i % 2 == 1:
+            cmake = f'set(TT_METAL_VERSION "{i:040x}")\n'
+            stream.append(f"M 100644 inline third_party/CMakeLists.txt\ndata {len(cmake)}\n{cmake}\n")
+            for f in range(files_per_commit):
+                body = "".join(f"// file {f} line {l} rev {i}\n" for l in range(lines_per_file))
+                stream.append(f"M 100644 inline lib/file{f}.cpp\ndata {len(body.encode())}\n{body}\n")
+        else:
+            body = f"// small change {i}\n"
+            stream.append(f"M 100644 inline lib/small.cpp\ndata {len(body)}\n{body}\n")
+    subprocess.run(["git", "-C", path, "fast-import", "--quiet"], input="".join(stream).encode(), check=True)
+    subprocess.run(["git", "-C", path, "reset", "-q", "--hard", "main"], check=True)
+
+
+def time_extractor(repo_path, extract_fn):
+    # Fresh Repo handle per run so neither approach benefits from the other's object cache
+    repo = git.Repo(repo_path)
+    commits = list(repo.iter_commits("main"))
+    start = time.perf_counter()
+    # Root commits are skipped: the diff-based approach diffs them against the working tree
+    results = [extract_fn(c) for c in commits if c.parents]
+    elapsed = time.perf_counter() - start
+    repo.close()
+    return elapsed, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark diff-based vs path-restricted pin extraction")
+    parser.add_argument("--commits", type=int, default=60)
+    parser.add_argument("--files-per-commit", type=int, default=300)
+    parser.add_argument("--lines-per-file", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo_path = os.path.join(tmp, "tt-mlir")
+        print(f"Building synthetic repo: {args.commits} commits, {args.files_per_commit} files x {args.lines_per_file} lines per uplift...")
+        build_repo(repo_path, args.commits, args.files_per_commit, args.lines_per_file)
+
+        diff_time, diff_results = time_extractor(repo_path, diff_based_metal_change)
+        path_time, path_results = time_extractor(repo_path, path_based_metal_change)
+
+    if diff_results != path_results:
+        print("ERROR: extractors disagree")
+        return 1
+
+    print(f"{'approach':<20} | {'time (s)':>10} | {'per commit (ms)':>16}")
+    print("-" * 52)
+    for name, elapsed in [("diff (previous)", diff_time), ("path lookup", path_time)]:
+        print(f"{name:<20} | {elapsed:>10.3f} | {1000 * elapsed / args.commits:>16.2f}")
+    print(f"\nSpeedup: {diff_time / path_time:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+CI Bisect Tool
+
+Purpose:
+    Find the first bad commit of a flattened uplift branch (jzx/uplift_tree, see show/uplift_history.py)
+    with CI runs. Each round probes k evenly spaced commits of the remaining range at once, so a range of
+    N commits takes about log_{k+1}(N) rounds of CI instead of log2(N).
+
+Usage:
+    python run/ci_bisect.py --good <rev> [--bad jzx/uplift_tree] [-k 3] [--repo tt-mlir] [--tt-xla] [--tt-forge-onnx]
+    # try it locally: a command decides each probe instead of CI
+    python run/ci_bisect.py --good <rev> --fake-runner 'test "$PROBE_SHA" != ...'
+
+Behavior:
+    - Candidates are the first-parent commits of <good>..<bad> in a local tt-mlir clone; <bad> must be bad
+      and <good> good.
+    - CI mode: every probe is triggered like run/shotgun.py (tt-mlir SHA as mlir_override for each target),
+      the runs are correlated and watched to completion. A probe is good if all its runs succeed, bad if
+      any fails or times out, and skipped otherwise (cancelled, no run found, ...). If every dispatch of a
+      round fails, the bisection stops with the gh error instead of skipping all the probes.
+    - Fake runner mode: CMD runs through the shell for each probe with $PROBE_SHA set;
+      exit 0 = good, 125 = skip (like `git bisect run`), anything else = bad.
+    - Prints the first bad commit with its orig_fe / orig_mlir / orig_metal header.
+
+Requirements:
+    - CI mode: GitHub CLI (gh) installed and authenticated, and the branch pushed to GitHub.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+
+import shotgun  # also puts show/ on sys.path
+from flattened_header import parse_flattened_header
+
+GOOD, BAD, SKIP = "good", "bad", "skip"
+BAD_CONCLUSIONS = {"failure", "timed_out"}
+SKIP_EXIT_CODE = 125
+DEFAULT_PROBES = 3
+
+
+def bisect_commits(repo_dir: str, good: str, bad: str) -> list[str]:
+    """First-parent commits of good..bad, oldest first (bad is the last one)."""
+    res = subprocess.run(["git", "-C", repo_dir, "rev-list", "--first-parent", "--reverse", f"{good}..{bad}"],
+                         capture_output=True, text=True)
+    if res.returncode != 0:
+        print(f"Failed to list {good}..{bad} in {repo_dir}: {res.stderr.strip()}", file=sys.stderr)
+        sys.exit(1)
+    return res.stdout.split()
+
+
+def pick_probes(lo: int, hi: int, k: int, tested: dict[int, str]) -> list[int]:
+    """
+    Up to k evenly spaced, not yet tested indices strictly between lo (last good) and hi (first bad).
+    A skipped index is replaced by the nearest untested one.
+    """
+    untested = [i for i in range(lo + 1, hi) if i not in tested]
+    if len(untested) <= k:
+        return untested
+    picks = []
+    for j in range(1, k + 1):
+        target = lo + round(j * (hi - lo) / (k + 1))
+        nearest = min((i for i in untested if i not in picks), key=lambda i: abs(i - target))
+        picks.append(nearest)
+    return sorted(picks)
+
+
+def narrow(lo: int, hi: int, tested: dict[int, str]) -> tuple[int, int]:
+    """
+    New (last good, first bad) from the verdicts so far. Assumes good..bad is monotonic; a good commit after
+    a bad one is reported and ignored.
+    """
+    hi = min([i for i, v in tested.items() if v == BAD and lo < i < hi] + [hi])
+    lo = max([i for i, v in tested.items() if v == GOOD and lo < i < hi] + [lo])
+    late_good = [i for i, v in tested.items() if v == GOOD and i > hi]
+    if late_good:
+        print(f"Warning: probe(s) {late_good} passed after a failing commit; the range isn't monotonic")
+    return lo, hi
+
+
+async def run_fake_probes(cmd: str, shas: list[str]) -> dict[str, str]:
+    """Run cmd for every probe concurrently with $PROBE_SHA set; its exit code is the verdict."""
+    async def probe(sha):
+        proc = await asyncio.create_subprocess_shell(cmd, env={**os.environ, "PROBE_SHA": sha})
+        code = await proc.wait()
+        return GOOD if code == 0 else SKIP if code == SKIP_EXIT_CODE else BAD
+
+    return dict(zip(shas, await asyncio.gather(*(probe(sha) for sha in shas))))
+
+
+def run_ci_probes(targets: list[dict], shas: list[str], args) -> dict[str, str]:
+    """Trigger, correlate and watch the runs of every probe; a probe's verdict combines all its targets' runs."""
+    results = asyncio.run(shotgun.shotgun(targets, shas, timeout=args.correlate_timeout,
+                                          max_concurrent=args.max_concurrent, interval=args.dispatch_interval))
+    shotgun.print_summary(results)
+    failed = [r for r in results if r["returncode"]]
+    if failed and len(failed) == len(results):
+        # gh itself is broken (auth, network, workflow name): skipping every probe would loop round after round
+        error = failed[0]["error"].strip() or f"exit code {failed[0]['returncode']}"
+        print(f"Every dispatch of this round failed, aborting the bisection. First gh error:\n{error}", file=sys.stderr)
+        sys.exit(1)
+    asyncio.run(shotgun.watch_runs(results, args.watch_interval))
+    verdicts = {}
+    for sha in shas:
+        runs = [r for r in results if r["sha"] == sha]
+        conclusions = [r.get("conclusion") if r["run_id"] is not None else None for r in runs]
+        if any(c in BAD_CONCLUSIONS for c in conclusions):
+            verdicts[sha] = BAD
+        elif all(c in shotgun.OK_CONCLUSIONS for c in conclusions):
+            verdicts[sha] = GOOD
+        else:
+            verdicts[sha] = SKIP
+    return verdicts
+
+
+def describe(repo_dir: str, sha: str) -> str:
+    res = subprocess.run(["git", "-C", repo_dir, "log", "-1", "--format=%B", sha], capture_output=True, text=True)
+    header = parse_flattened_header(res.stdout)
+    subject = next((line for line in res.stdout.splitlines() if line and not line.startswith("orig_fe=")), "")
+    if header:
+        orig_fe, orig_mlir, orig_metal = header
+        return f"{sha[:10]} | orig_fe={orig_fe} | orig_mlir={orig_mlir} | orig_metal={orig_metal} | {subject}"
+    return f"{sha[:10]} | {subject}"
+
+
+def bisect(commits: list[str], k: int, run_probes) -> tuple[int, int, dict[int, str], int]:
+    """
+    k-ary bisection of commits (the last one is known bad, its parent range start known good).
+    run_probes(shas) -> {sha: verdict}. Returns (last good index, first bad index, verdicts by index, rounds);
+    the last good index is -1 for the --good commit.
+    """
+    lo, hi = -1, len(commits) - 1
+    tested = {}
+    rounds = 0
+    while True:
+        probes = pick_probes(lo, hi, k, tested)
+        if not probes:
+            return lo, hi, tested, rounds
+        rounds += 1
+        print(f"\n{shotgun.COLOR['header']}==> Round {rounds}: {hi - lo - 1} candidate(s) left, "
+              f"probing {len(probes)}{shotgun.COLOR['reset']}")
+        verdicts = run_probes([commits[i] for i in probes])
+        for i in probes:
+            tested[i] = verdicts[commits[i]]
+            print(f"   #{i + 1:<5} {commits[i][:10]}  {tested[i]}")
+        lo, hi = narrow(lo, hi, tested)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="k-ary CI bisection of a flattened uplift branch.")
+    parser.add_argument("--good", required=True, help="Known good tt-mlir commit (e.g. the base of jzx/uplift_tree)")
+    parser.add_argument("--bad", default="jzx/uplift_tree", help="Known bad commit (default: jzx/uplift_tree)")
+    parser.add_argument("--repo", default="tt-mlir", help="Local tt-mlir clone with the branch (default: ./tt-mlir)")
+    parser.add_argument("-k", "--probes", type=int, default=DEFAULT_PROBES,
+                        help=f"Commits probed concurrently per round (default: {DEFAULT_PROBES})")
+    parser.add_argument("--fake-runner", metavar="CMD",
+                        help="Decide probes with a local shell command instead of CI ($PROBE_SHA; exit 0 good, 125 skip, else bad)")
+    for target in shotgun.TARGETS:
+        parser.add_argument(f"--{target['name']}", action="store_true", help=f"Probe with {target['name']} {target['workflow']}")
+    parser.add_argument("--correlate-timeout", type=float, default=shotgun.CORRELATE_TIMEOUT,
+                        help=f"Seconds to wait for each dispatched run to appear (default: {shotgun.CORRELATE_TIMEOUT})")
+    parser.add_argument("--watch-interval", type=float, default=shotgun.WATCH_INTERVAL,
+                        help=f"Seconds between run status polls (default: {shotgun.WATCH_INTERVAL})")
+    parser.add_argument("--max-concurrent", type=int, default=shotgun.MAX_CONCURRENT,
+                        help=f"Maximum dispatches in flight at once (default: {shotgun.MAX_CONCURRENT})")
+    parser.add_argument("--dispatch-interval", type=float, default=shotgun.DISPATCH_INTERVAL,
+                        help=f"Minimum seconds between the starts of two dispatches (default: {shotgun.DISPATCH_INTERVAL})")
+    args = parser.parse_args()
+    if args.probes < 1:
+        print("-k must be at least 1.", file=sys.stderr)
+        sys.exit(2)
+
+    commits = bisect_commits(args.repo, args.good, args.bad)
+    if not commits:
+        print(f"Nothing to bisect: {args.good}..{args.bad} is empty.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.fake_runner:
+        def run_probes(shas):
+            return asyncio.run(run_fake_probes(args.fake_runner, shas))
+    else:
+        shotgun.ensure_gh_cli()
+        targets = [t for t in shotgun.TARGETS if getattr(args, t["name"].replace("-", "_"))] or shotgun.TARGETS
+
+        def run_probes(shas):
+            return run_ci_probes(targets, shas, args)
+
+    print(f"Bisecting {len(commits)} commit(s) of {args.good}..{args.bad}, {args.probes} probe(s) per round")
+    lo, hi, tested, rounds = bisect(commits, args.probes, run_probes)
+
+    print()
+    skipped = [i for i in range(lo + 1, hi) if tested.get(i) == SKIP]
+    if skipped:
+        print(f"Could not narrow further: {len(skipped)} skipped commit(s) between the last good and first bad:")
+        for i in range(lo + 1, hi + 1):
+            print(f"   {describe(args.repo, commits[i])}")
+    label = "First known bad commit" if skipped else "First bad commit"
+    print(f"{label} (after {rounds} round(s), {len(tested)} probe(s)):")
+    print(f"   {describe(args.repo, commits[hi])}")
+    if lo >= 0:
+        print(f"Last good commit:\n   {describe(args.repo, commits[lo])}")
+
+
+if __name__ == "__main__":
+    main()
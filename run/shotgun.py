@@ -7,17 +7,28 @@ Purpose:
     of a specified tt-mlir branch as mlir_override.
 
 Usage:
-    python run/shotgun.py <mlir-uplift-branch> [--tt-xla] [--tt-forge-onnx] [--dry-run]
+    python run/shotgun.py <mlir-uplift-branch | sha> [--tt-xla] [--tt-forge-onnx] [--local-clone] [--dry-run]
     # or
     python run/shotgun.py --mlir-uplift-branch <branch> [--tt-xla] [--tt-forge-onnx] [--dry-run]
+    # batches
+    python run/shotgun.py --batch-file shas.txt [--manifest runs.json]
+    python run/shotgun.py --range <base>..jzx/uplift_tree --every 10 [--repo tt-mlir] [--manifest runs.json]
 
 Behavior:
-    - Clones or checks out tt-mlir via SSH, switches to the provided branch, resolves HEAD SHA.
-    - If neither --tt-xla nor --tt-forge-onnx is specified, both are triggered (with a warning).
+    - Resolves the branch HEAD SHA with `git ls-remote` (falling back to `gh api`), without cloning.
+      A full 40-character SHA is used as-is. --local-clone restores the old clone/checkout path.
+    - If no target flag is specified, all TARGETS are triggered (with a warning).
     - Always prints the constructed gh command; with --dry-run, commands are not executed.
-    - After triggering, prints the URL of the most recent workflow run (best effort).
-
-Workflows:
+    - The selected workflows are triggered concurrently, then a summary lists each target's
+      status, time and the URL of the run the dispatch created (see correlate_runs).
+      Exits non-zero if any dispatch failed.
+    - Batch mode (--batch-file / --range) triggers every target for many tt-mlir SHAs, resolved in bulk,
+      at most --max-concurrent dispatches at a time and --dispatch-interval seconds apart (1 s by default;
+      a single-branch run starts its targets together unless --dispatch-interval is given).
+      --manifest writes tt-mlir SHA -> run IDs per target as JSON.
+    - With --watch, follows the runs to completion in one polling loop and exits non-zero unless all succeeded.
+
+Workflows (TARGETS; add an entry to trigger another repo / workflow):
     - tt-xla: .github/workflows/manual-test.yml (test_suite=mlir-uplift-qualification.json)
     - tt-forge-onnx: .github/workflows/on-pr.yml
 
@@ -27,9 +38,19 @@ Requirements:
 """
 
 import argparse
+import asyncio
+import json
 import os
+import re
 import subprocess
 import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "show"))
+import clone_strategy
+import github_client
+
 # ANSI colors
 COLOR = {
     "header": "\033[1;36m",   # bold cyan
@@ -45,11 +66,43 @@ REPO_SSH = {
 
 # GitHub repositories (owner/repo)
 GH_REPOS = {
+    "tt-mlir": "tenstorrent/tt-mlir",
     "tt-xla": "tenstorrent/tt-xla",
     # tt-forge-fe renamed to tt-forge-onnx
     "tt-forge-onnx": "tenstorrent/tt-forge-onnx",
 }
 
+# Workflows shotgun can trigger; each gets a --<name> flag. "{sha}" in an input is replaced with the tt-mlir SHA.
+TARGETS = [
+    {
+        "name": "tt-xla",
+        "repo": GH_REPOS["tt-xla"],
+        "workflow": "manual-test.yml",
+        "inputs": {"test_suite": "mlir-uplift-qualification.json", "mlir_override": "{sha}"},
+    },
+    {
+        "name": "tt-forge-onnx",
+        "repo": GH_REPOS["tt-forge-onnx"],
+        "workflow": "on-pr.yml",
+        "inputs": {"mlir_override": "{sha}"},
+    },
+]
+
+# Batches: limits on how fast workflows are dispatched
+MAX_CONCURRENT = 4
+DISPATCH_INTERVAL = 1.0       # seconds between dispatch starts in batch mode
+
+# Correlating dispatches with their runs (gh workflow run doesn't return the run it creates)
+CORRELATE_TIMEOUT = 120       # seconds to wait for the runs to show up
+POLL_INITIAL = 2.0            # first delay between `gh run list` rounds, doubled every round...
+POLL_MAX = 30.0               # ...up to this
+CLOCK_SKEW = timedelta(seconds=10)  # tolerated difference between our clock and GitHub's
+RUN_LIST_LIMIT = 20
+# --watch
+WATCH_INTERVAL = 60           # seconds between status polls
+OK_CONCLUSIONS = {"success", "neutral", "skipped"}
+SHA_RE = re.compile(r"\b[0-9a-f]{40}\b")
+
 
 def run(cmd: list[str], cwd: str | None = None, check: bool = True) -> subprocess.CompletedProcess:
     return subprocess.run(cmd, cwd=cwd, check=check, text=True, capture_output=True)
@@ -70,11 +123,12 @@ def clone_or_checkout_tt_mlir(branch: str) -> str:
     repo_dir = os.path.abspath(os.path.join(os.getcwd(), "tt-mlir"))
     if not os.path.isdir(repo_dir):
         print(f"Cloning tt-mlir via SSH to {repo_dir}...")
-        run(["git", "clone", REPO_SSH["tt-mlir"], repo_dir])
+        clone_strategy.clone(REPO_SSH["tt-mlir"], repo_dir, "tt-mlir", text=True, capture_output=True)
 
     # Fetch and checkout branch
     print(f"\n{COLOR['header']}==> Checking out tt-mlir branch '{branch}'...{COLOR['reset']}")
     try:
+        clone_strategy.prepare_fetch(repo_dir, "tt-mlir", REPO_SSH["tt-mlir"], text=True, capture_output=True)
         run(["git", "fetch", "origin"], cwd=repo_dir)
         # Try checkout, create local tracking if needed
         rc = run(["git", "rev-parse", f"origin/{branch}"], cwd=repo_dir, check=False)
@@ -92,6 +146,64 @@ def clone_or_checkout_tt_mlir(branch: str) -> str:
     return repo_dir
 
 
+def _gh_resolve(ref: str) -> str | None:
+    rc = run(["gh", "api", f"repos/{GH_REPOS['tt-mlir']}/commits/{ref}", "--jq", ".sha"], check=False)
+    sha = rc.stdout.strip()
+    return sha if rc.returncode == 0 and len(sha) == 40 else None
+
+
+def resolve_refs(refs: list[str]) -> dict[str, str]:
+    """
+    Resolve tt-mlir branches / SHAs to full SHAs without cloning. Full 40-character SHAs are returned unchanged;
+    all branches are looked up with a single `git ls-remote`, and whatever that can't resolve (no SSH key,
+    short SHAs, tags) is asked of `gh api` one by one. Exits if a ref can't be resolved.
+    """
+    resolved = {ref: ref for ref in refs if SHA_RE.fullmatch(ref)}
+    branches = [ref for ref in dict.fromkeys(refs) if ref not in resolved]
+    if branches:
+        rc = run(["git", "ls-remote", "--heads", REPO_SSH["tt-mlir"], *(f"refs/heads/{b}" for b in branches)], check=False)
+        lines = rc.stdout.splitlines() if rc.returncode == 0 else []
+        heads = {ref: sha for sha, ref in (line.split("\t", 1) for line in lines)}
+        for branch in branches:
+            sha = heads.get(f"refs/heads/{branch}") or _gh_resolve(branch)
+            if not sha:
+                print(f"Failed to resolve tt-mlir ref '{branch}'", file=sys.stderr)
+                sys.exit(1)
+            resolved[branch] = sha
+    return {ref: resolved[ref] for ref in refs}
+
+
+def resolve_branch_sha(branch: str) -> str:
+    """
+    Resolve a tt-mlir branch to its HEAD SHA without cloning: `git ls-remote`, then `gh api` as a fallback
+    (e.g. no SSH key on this machine). A full 40-character SHA is returned unchanged.
+    """
+    return resolve_refs([branch])[branch]
+
+
+def read_batch_file(path: str) -> list[str]:
+    """Branches / SHAs from a file, one per line; blank lines and # comments are ignored."""
+    with open(path) as f:
+        refs = [line.split("#", 1)[0].strip() for line in f]
+    return [ref for ref in refs if ref]
+
+
+def range_shas(repo_dir: str, rev_range: str, every: int = 1) -> list[str]:
+    """
+    Every `every`-th first-parent commit of rev_range (e.g. "base..jzx/uplift_tree") in a local tt-mlir clone,
+    oldest first, always ending with the newest commit.
+    """
+    res = run(["git", "rev-list", "--first-parent", "--reverse", rev_range], cwd=repo_dir, check=False)
+    if res.returncode != 0:
+        print(f"Failed to list {rev_range} in {repo_dir}: {res.stderr.strip()}", file=sys.stderr)
+        sys.exit(1)
+    commits = res.stdout.split()
+    picked = commits[every - 1::every]
+    if commits and (not picked or picked[-1] != commits[-1]):
+        picked.append(commits[-1])
+    return picked
+
+
 def get_head_sha(repo_dir: str) -> str:
     res = run(["git", "rev-parse", "HEAD"], cwd=repo_dir)
     sha = res.stdout.strip()
@@ -105,66 +217,270 @@ def _format_cmd(cmd: list[str]) -> str:
     return " ".join(subprocess.list2cmdline([c]) for c in cmd)
 
 
-def _print_run_url(repo: str, workflow: str) -> None:
-    """Attempt to locate and print the latest run URL for a workflow in a repo."""
+async def run_async(cmd: list[str]) -> tuple[int, str, str]:
+    """Like run(check=False), without blocking the event loop: returns (returncode, stdout, stderr)."""
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    out, err = await proc.communicate()
+    return proc.returncode, out.decode(), err.decode()
+
+
+def dispatch_command(target: dict, mlir_sha: str) -> list[str]:
+    """The `gh workflow run` command for a TARGETS entry."""
+    cmd = ["gh", "workflow", "run", target["workflow"], "-R", target["repo"]]
+    for key, value in target["inputs"].items():
+        cmd += ["-f", f"{key}={value.format(sha=mlir_sha)}"]
+    return cmd
+
+
+async def dispatch_target(target: dict, mlir_sha: str, dry_run: bool = False) -> dict:
+    """
+    Trigger one target's workflow. Never raises: returns a result dict with name, target, sha,
+    returncode (None for a dry run), seconds, error, dispatched_at (UTC), and run_id / url for correlate_runs().
+    """
+    result = {"name": target["name"], "target": target, "sha": mlir_sha, "returncode": None, "seconds": 0.0,
+              "error": "", "dispatched_at": None, "run_id": None, "url": None}
+    if dry_run:
+        return result
+    start = time.perf_counter()
+    result["dispatched_at"] = datetime.now(timezone.utc)
     try:
-        # Use gh run list to fetch the latest runs for this workflow
-        # gh run list -R <repo> --workflow <workflow> --limit 1 --json url -q '.[0].url'
-        res = run([
-            "gh", "run", "list",
-            "-R", repo,
-            "--workflow", workflow,
-            "--limit", "1",
-            "--json", "url",
-        ], check=False)
-        # Output is JSON like: [{"url":"https://..."}]
-        import json
-        data = json.loads(res.stdout or "[]")
-        if isinstance(data, list) and data:
-            url = data[0].get("url")
-            if url:
-                print(f"{COLOR['url']}Workflow run URL: {url}{COLOR['reset']}")
-                return
-    except Exception:
-        pass
-    print(f"{COLOR['url']}Workflow run URL: (unavailable){COLOR['reset']}")
+        result["returncode"], _, err = await run_async(dispatch_command(target, mlir_sha))
+        result["error"] = err.strip()
+    except OSError as e:
+        result["returncode"], result["error"] = -1, str(e)
+    result["seconds"] = time.perf_counter() - start
+    return result
 
 
-def trigger_tt_xla(mlir_sha: str, dry_run: bool = False) -> None:
+async def dispatch_all(jobs: list[tuple[dict, str]], dry_run: bool = False,
+                       max_concurrent: int | None = None, interval: float = 0.0) -> list[dict]:
     """
-    Trigger tt-xla manual-test.yml with test_suite mlir-uplift-qualification.json and mlir_override.
+    Trigger every (target, tt-mlir SHA) job concurrently; results are in the order of jobs.
+    At most max_concurrent dispatches are in flight at once, and they start at least interval seconds apart.
     """
-    repo = GH_REPOS["tt-xla"]
-    print(f"\n{COLOR['header']}==> Triggering tt-xla (manual-test.yml) with mlir_override={mlir_sha}...{COLOR['reset']}")
-    # gh workflow run manual-test.yml -R tenstorrent/tt-xla -f test_suite=mlir-uplift-qualification.json -f mlir_override=<sha>
-    cmd = [
-        "gh", "workflow", "run", "manual-test.yml",
-        "-R", repo,
-        "-f", "test_suite=mlir-uplift-qualification.json",
-        "-f", f"mlir_override={mlir_sha}"
-    ]
-    print(f"{COLOR['cmd']}   GH command: {_format_cmd(cmd)}{COLOR['reset']}")
-    if not dry_run:
-        run(cmd)
-        _print_run_url(repo, "manual-test.yml")
+    for target, mlir_sha in jobs:
+        print(f"\n{COLOR['header']}==> Triggering {target['name']} ({target['workflow']}) with mlir_override={mlir_sha}...{COLOR['reset']}")
+        print(f"{COLOR['cmd']}   GH command: {_format_cmd(dispatch_command(target, mlir_sha))}{COLOR['reset']}")
+    semaphore = asyncio.Semaphore(max_concurrent or len(jobs) or 1)
+    next_start = time.monotonic()
+
+    async def limited(target, mlir_sha):
+        nonlocal next_start
+        async with semaphore:
+            wait = next_start - time.monotonic()
+            next_start = max(next_start, time.monotonic()) + interval
+            if wait > 0 and not dry_run:
+                await asyncio.sleep(wait)
+            return await dispatch_target(target, mlir_sha, dry_run)
+
+    return await asyncio.gather(*(limited(t, sha) for t, sha in jobs))
+
+
+async def gh_actor() -> str | None:
+    """Login of the account gh is authenticated as, or None if it can't be determined."""
+    rc, out, _ = await run_async(["gh", "api", "user", "--jq", ".login"])
+    return (out.strip() or None) if rc == 0 else None
+
+
+async def list_dispatched_runs(repo: str, workflow: str, actor: str | None, limit: int = RUN_LIST_LIMIT) -> list[dict]:
+    """Recent workflow_dispatch runs of a workflow (by actor, if known), newest first. [] on error."""
+    cmd = ["gh", "run", "list", "-R", repo, "--workflow", workflow, "--event", "workflow_dispatch",
+           "--limit", str(limit), "--json", "databaseId,url,createdAt,displayTitle,status,conclusion"]
+    if actor:
+        cmd += ["--user", actor]
+    rc, out, _ = await run_async(cmd)
+    try:
+        return json.loads(out or "[]") if rc == 0 else []
+    except ValueError:
+        return []
+
+
+def _created_at(run_info: dict) -> datetime:
+    return datetime.fromisoformat(run_info["createdAt"].replace("Z", "+00:00"))
 
 
-def trigger_tt_forge_onnx_workflow(mlir_sha: str, dry_run: bool = False) -> None:
+def match_runs(results: list[dict], runs: list[dict], claimed: set) -> None:
     """
-    Trigger tt-forge-onnx on-pr.yml with mlir_override.
+    Assign runs to the dispatches in results (all of one repo/workflow), setting run_id / url and adding the
+    run to claimed. A run matches if it was created after the dispatch and isn't claimed yet. Runs whose title
+    names our SHA are preferred, and runs whose title names a different SHA are skipped (workflows with a
+    run-name showing the inputs). Otherwise dispatches are paired with runs in creation order, so once a
+    dispatch has no candidate yet, later ones wait for the next round rather than take its run.
     """
-    repo = GH_REPOS["tt-forge-onnx"]
-    print(f"\n{COLOR['header']}==> Triggering tt-forge-onnx (on-pr.yml) with mlir_override={mlir_sha}...{COLOR['reset']}")
-    # gh workflow run on-pr.yml -R tenstorrent/tt-forge-onnx -f mlir_override=<sha>
-    cmd = [
-        "gh", "workflow", "run", "on-pr.yml",
-        "-R", repo,
-        "-f", f"mlir_override={mlir_sha}"
-    ]
-    print(f"{COLOR['cmd']}   GH command: {_format_cmd(cmd)}{COLOR['reset']}")
+    runs = sorted(runs, key=_created_at)
+    blocked = False
+    for result in sorted(results, key=lambda r: r["dispatched_at"]):
+        if result["run_id"] is not None:
+            continue
+        candidates = []
+        for run_info in runs:
+            if run_info["databaseId"] in claimed or _created_at(run_info) < result["dispatched_at"] - CLOCK_SKEW:
+                continue
+            shas = SHA_RE.findall(run_info.get("displayTitle") or "")
+            if shas and result["sha"] not in shas:
+                continue
+            candidates.append(run_info)
+        named = [c for c in candidates if result["sha"] in (c.get("displayTitle") or "")]
+        if not named and (blocked or not candidates):
+            blocked = True
+            continue
+        run_info = (named or candidates)[0]
+        claimed.add(run_info["databaseId"])
+        result["run_id"], result["url"] = run_info["databaseId"], run_info["url"]
+
+
+async def correlate_runs(results: list[dict], timeout: float = CORRELATE_TIMEOUT) -> None:
+    """
+    Find the run each successful dispatch created: one poll loop for all of them, listing each repo/workflow
+    once per round (concurrently) with exponential backoff between rounds, until every dispatch has a run or
+    timeout seconds have passed. Dispatches without a run keep run_id None.
+    """
+    pending = [r for r in results if r["returncode"] == 0 and r["run_id"] is None]
+    if not pending:
+        return
+    actor = await gh_actor()
+    claimed = {r["run_id"] for r in results if r["run_id"] is not None}
+    deadline = time.monotonic() + timeout
+    delay = POLL_INITIAL
+    while True:
+        groups = {}
+        for r in pending:
+            groups.setdefault((r["target"]["repo"], r["target"]["workflow"]), []).append(r)
+        listings = await asyncio.gather(*(list_dispatched_runs(repo, wf, actor, RUN_LIST_LIMIT + len(group))
+                                          for (repo, wf), group in groups.items()))
+        for group, runs in zip(groups.values(), listings):
+            match_runs(group, runs, claimed)
+        pending = [r for r in pending if r["run_id"] is None]
+        remaining = deadline - time.monotonic()
+        if not pending or remaining <= 0:
+            return
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, POLL_MAX)
+
+
+async def shotgun(targets: list[dict], mlir_shas: list[str], dry_run: bool = False,
+                  timeout: float = CORRELATE_TIMEOUT, max_concurrent: int | None = None,
+                  interval: float = 0.0) -> list[dict]:
+    """Trigger every target for every tt-mlir SHA, then correlate every successful dispatch with its run."""
+    jobs = [(target, sha) for sha in mlir_shas for target in targets]
+    results = await dispatch_all(jobs, dry_run=dry_run, max_concurrent=max_concurrent, interval=interval)
     if not dry_run:
-        run(cmd)
-        _print_run_url(repo, "on-pr.yml")
+        await correlate_runs(results, timeout)
+    return results
+
+
+def ensure_github_token() -> None:
+    """Let github_client use gh's credentials when GITHUB_TOKEN / GH_TOKEN isn't set."""
+    if github_client.get_token():
+        return
+    rc = run(["gh", "auth", "token"], check=False)
+    if rc.returncode == 0 and rc.stdout.strip():
+        os.environ["GH_TOKEN"] = rc.stdout.strip()
+
+
+def fetch_run(repo: str, run_id: int) -> dict:
+    # conditional request: an unchanged run is a 304 from the ETag cache and doesn't count against the rate limit
+    text, _ = github_client.get(f"repos/{repo}/actions/runs/{run_id}")
+    return json.loads(text)
+
+
+def _format_elapsed(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+
+def watch_table(results: list[dict]) -> list[str]:
+    lines = [f"{'target':<20} | {'tt-mlir':<10} | {'run':<12} | {'status':<12} | {'conclusion':<16} | url", "-" * 100]
+    for r in results:
+        if r["run_id"] is None:
+            lines.append(f"{r['name']:<20} | {r['sha'][:10]} | {'-':<12} | {'not found':<12} | {'-':<16} |")
+            continue
+        status = r.get("run_status") or "?"
+        conclusion = r.get("conclusion") or r.get("watch_error") or "-"
+        lines.append(f"{r['name']:<20} | {r['sha'][:10]} | {r['run_id']:<12} | {status:<12} | {conclusion[:16]:<16} | {r['url']}")
+    return lines
+
+
+async def watch_runs(results: list[dict], interval: float = WATCH_INTERVAL) -> bool:
+    """
+    Follow the correlated runs of results until all of them have completed. One loop for all runs: each round
+    makes one conditional request per unfinished run (concurrently), then waits interval seconds.
+    On a terminal the status table is redrawn in place; otherwise it is printed whenever a status changes.
+    Returns True if every run concluded successfully (a dispatch without a run counts as a failure).
+    """
+    results = [r for r in results if r["returncode"] == 0]
+    watched = [r for r in results if r["run_id"] is not None]
+    ensure_github_token()
+    live = sys.stdout.isatty()
+    start = time.monotonic()
+    drawn = 0
+    last = None
+    print(f"\n{COLOR['header']}==> Watching {len(watched)} run(s), polling every {interval:.0f}s...{COLOR['reset']}")
+    while True:
+        active = [r for r in watched if r.get("run_status") != "completed"]
+        infos = await asyncio.gather(*(asyncio.to_thread(fetch_run, r["target"]["repo"], r["run_id"]) for r in active),
+                                     return_exceptions=True)
+        for r, info in zip(active, infos):
+            if isinstance(info, Exception):
+                # transient API trouble; keep the last known status and try again next round
+                r["watch_error"] = f"error: {info}"
+                continue
+            r["watch_error"] = None
+            r["run_status"], r["conclusion"] = info["status"], info.get("conclusion")
+        lines = watch_table(results)
+        done = all(r.get("run_status") == "completed" for r in watched)
+        if live:
+            lines.append(f"elapsed {_format_elapsed(time.monotonic() - start)}")
+            print((f"\033[{drawn}F" if drawn else "") + "\n".join(line + "\033[K" for line in lines), flush=True)
+            drawn = len(lines)
+        elif lines != last:
+            print(f"\n[{datetime.now().strftime('%H:%M:%S')}]")
+            print("\n".join(lines), flush=True)
+        last = lines
+        if done:
+            break
+        await asyncio.sleep(interval)
+    return all(r["run_id"] is not None and r.get("conclusion") in OK_CONCLUSIONS for r in results)
+
+
+def write_manifest(path: str, results: list[dict], refs: dict[str, str]) -> None:
+    """
+    JSON manifest for collecting the results later: tt-mlir SHA -> {"ref": branch or SHA given,
+    "runs": {target: {"repo", "workflow", "run_id", "url", "error"}}}.
+    """
+    names = {sha: ref for ref, sha in refs.items()}
+    manifest = {}
+    for r in results:
+        entry = manifest.setdefault(r["sha"], {"ref": names.get(r["sha"], r["sha"]), "runs": {}})
+        entry["runs"][r["name"]] = {
+            "repo": r["target"]["repo"],
+            "workflow": r["target"]["workflow"],
+            "run_id": r["run_id"],
+            "url": r["url"],
+            "error": r["error"] if r["returncode"] else "",
+        }
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    print(f"Manifest written to {path}")
+
+
+def print_summary(results: list[dict]) -> None:
+    print(f"\n{'target':<20} | {'tt-mlir':<10} | {'status':<10} | {'time (s)':>8} | run")
+    print("-" * 100)
+    for r in results:
+        if r["returncode"] is None:
+            status = "dry-run"
+        else:
+            status = "ok" if r["returncode"] == 0 else f"failed ({r['returncode']})"
+        if r["returncode"] is None:
+            detail = "-"
+        elif r["returncode"]:
+            detail = r["error"].splitlines()[-1] if r["error"] else ""
+        else:
+            detail = f"{COLOR['url']}{r['url'] or '(run not found)'}{COLOR['reset']}"
+        print(f"{r['name']:<20} | {r['sha'][:10]} | {status:<10} | {r['seconds']:>8.1f} | {detail}")
 
 
 def main() -> None:
@@ -173,22 +489,92 @@ def main() -> None:
     parser.add_argument(
         "branch",
         nargs="?",
-        help="tt-mlir branch to checkout and read HEAD SHA from (positional)"
+        help="tt-mlir branch (or full SHA) to resolve the HEAD SHA of (positional)"
     )
     parser.add_argument(
         "--mlir-uplift-branch",
         dest="branch_flag",
-        help="tt-mlir branch to checkout and read HEAD SHA from (flag)"
+        help="tt-mlir branch (or full SHA) to resolve the HEAD SHA of (flag)"
+    )
+    for target in TARGETS:
+        inputs = ", ".join(f"{k}={v}" for k, v in target["inputs"].items())
+        parser.add_argument(
+            f"--{target['name']}",
+            action="store_true",
+            help=f"Trigger {target['name']} {target['workflow']} ({inputs})"
+        )
+    parser.add_argument(
+        "--batch-file",
+        help="Trigger for every tt-mlir branch / SHA listed in this file (one per line, # comments)"
+    )
+    parser.add_argument(
+        "--range",
+        help="Trigger for the first-parent commits of this range (e.g. base..jzx/uplift_tree) in a local tt-mlir clone"
+    )
+    parser.add_argument(
+        "--every",
+        type=int,
+        default=1,
+        help="With --range: only every Nth commit (the newest is always included)"
+    )
+    parser.add_argument(
+        "--repo",
+        default="tt-mlir",
+        help="With --range: local tt-mlir clone to read the range from (default: ./tt-mlir)"
+    )
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=MAX_CONCURRENT,
+        help=f"Maximum dispatches in flight at once (default: {MAX_CONCURRENT})"
+    )
+    parser.add_argument(
+        "--dispatch-interval",
+        type=float,
+        default=None,
+        help=f"Minimum seconds between the starts of two dispatches "
+             f"(default: {DISPATCH_INTERVAL} with --batch-file / --range, 0 otherwise)"
     )
     parser.add_argument(
-        "--tt-xla",
+        "--manifest",
+        help="Write a JSON manifest (tt-mlir SHA -> run per target) to this file"
+    )
+    parser.add_argument(
+        "--local-clone",
+        action="store_true",
+        help="Clone/fetch tt-mlir into ./tt-mlir and check the branch out instead of asking the remote (slow)"
+    )
+    parser.add_argument(
+        "--clone",
+        choices=clone_strategy.STRATEGIES,
+        help="With --local-clone: how to clone tt-mlir if it's missing (default: $INTEGRATION_TOOLS_CLONE or full); only the branch HEAD is read, so treeless is enough"
+    )
+    parser.add_argument(
+        "--sparse",
         action="store_true",
-        help="Trigger tt-xla manual-test.yml with mlir-uplift-qualification.json"
+        default=None,
+        help="With --local-clone: limit a fresh tt-mlir checkout to third_party/"
+    )
+    parser.add_argument(
+        "--mirror-dir",
+        help="With --local-clone: clone tt-mlir through a shared bare mirror in this directory (default: $INTEGRATION_TOOLS_MIRRORS, or none)"
+    )
+    parser.add_argument(
+        "--correlate-timeout",
+        type=float,
+        default=CORRELATE_TIMEOUT,
+        help=f"Seconds to wait for each dispatched run to appear (default: {CORRELATE_TIMEOUT})"
     )
     parser.add_argument(
-        "--tt-forge-onnx",
+        "--watch",
         action="store_true",
-        help="Trigger tt-forge-onnx on-pr.yml"
+        help="After triggering, follow the runs until they complete; exit 1 unless all succeed"
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=WATCH_INTERVAL,
+        help=f"Seconds between --watch status polls (default: {WATCH_INTERVAL})"
     )
     parser.add_argument(
         "--dry-run",
@@ -197,32 +583,64 @@ def main() -> None:
     )
 
     args = parser.parse_args()
+    clone_strategy.configure(args.clone, args.sparse, args.mirror_dir)
 
-    # Resolve branch from positional or flag
+    # Resolve branch from positional or flag, or take a batch
     branch = args.branch_flag or args.branch
-    if not branch:
-        print("Missing mlir uplift branch. Provide positional <branch> or --mlir-uplift-branch.", file=sys.stderr)
+    if sum(map(bool, [branch, args.batch_file, args.range])) != 1:
+        print("Provide exactly one of: positional <branch>, --mlir-uplift-branch, --batch-file or --range.", file=sys.stderr)
+        sys.exit(2)
+    if args.every < 1:
+        print("--every must be at least 1.", file=sys.stderr)
+        sys.exit(2)
+    if args.local_clone and not branch:
+        print("--local-clone only works with a single branch.", file=sys.stderr)
         sys.exit(2)
 
     # If neither target passed, run both and warn
-    if not (args.tt_xla or args.tt_forge_onnx):
-        print("Warning: no targets specified; triggering both tt-xla and tt-forge-onnx.")
-        args.tt_xla = True
-        args.tt_forge_onnx = True
+    targets = [t for t in TARGETS if getattr(args, t["name"].replace("-", "_"))]
+    if not targets:
+        print(f"Warning: no targets specified; triggering all of {', '.join(t['name'] for t in TARGETS)}.")
+        targets = TARGETS
 
     ensure_gh_cli()
 
-    # Prepare tt-mlir repo
-    repo_dir = clone_or_checkout_tt_mlir(branch)
-    mlir_sha = get_head_sha(repo_dir)
-    print(f"\n{COLOR['header']}Resolved tt-mlir HEAD on '{branch}': {mlir_sha}{COLOR['reset']}")
+    # Resolve the tt-mlir SHA(s)
+    if args.local_clone:
+        repo_dir = clone_or_checkout_tt_mlir(branch)
+        refs = {branch: get_head_sha(repo_dir)}
+    elif args.range:
+        refs = {sha: sha for sha in range_shas(args.repo, args.range, args.every)}
+    else:
+        refs = resolve_refs(read_batch_file(args.batch_file) if args.batch_file else [branch])
+    if not refs:
+        print("Nothing to trigger: no tt-mlir commits selected.", file=sys.stderr)
+        sys.exit(1)
+    for ref, mlir_sha in refs.items():
+        if ref == mlir_sha:
+            print(f"\n{COLOR['header']}Using tt-mlir commit {mlir_sha}{COLOR['reset']}")
+        else:
+            print(f"\n{COLOR['header']}Resolved tt-mlir HEAD on '{ref}': {mlir_sha}{COLOR['reset']}")
 
     # Trigger selected workflows
-    if args.tt_xla:
-        trigger_tt_xla(mlir_sha, dry_run=args.dry_run)
-    if args.tt_forge_onnx:
-        trigger_tt_forge_onnx_workflow(mlir_sha, dry_run=args.dry_run)
-
+    mlir_shas = list(dict.fromkeys(refs.values()))
+    # only throttle many dispatches; a single branch starts all its targets at once
+    interval = args.dispatch_interval
+    if interval is None:
+        interval = DISPATCH_INTERVAL if args.batch_file or args.range else 0.0
+    results = asyncio.run(shotgun(targets, mlir_shas, dry_run=args.dry_run, timeout=args.correlate_timeout,
+                                  max_concurrent=args.max_concurrent, interval=interval))
+    print_summary(results)
+    if args.manifest:
+        write_manifest(args.manifest, results, refs)
+
+    failed = [r["name"] for r in results if r["returncode"]]
+    if failed:
+        print(f"\nFailed to trigger: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+    if args.watch and not args.dry_run and not asyncio.run(watch_runs(results, args.watch_interval)):
+        print("\nNot all runs succeeded.", file=sys.stderr)
+        sys.exit(1)
     print("\nDone.\n")
 
 
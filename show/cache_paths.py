@@ -0,0 +1,20 @@
+"""
+Location of the on-disk caches shared by the integration tools.
+
+Defaults to ~/.cache/integration-tools (or $XDG_CACHE_HOME/integration-tools).
+Override with INTEGRATION_TOOLS_CACHE, e.g. to share one cache between runners.
+"""
+import os
+
+
+def get_cache_dir(*parts):
+    """
+    Return (and create) a directory under the integration-tools cache root.
+    """
+    base = os.environ.get("INTEGRATION_TOOLS_CACHE")
+    if not base:
+        xdg = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        base = os.path.join(xdg, "integration-tools")
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
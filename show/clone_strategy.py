@@ -0,0 +1,212 @@
+"""
+Shared clone strategy for the repos the tools check out (tt-mlir, tt-metal, FEs).
+
+Most tools only need commit metadata plus one small file per commit (third_party/CMakeLists.txt), so
+multi-GB full clones of tt-mlir / tt-metal are wasted on a fresh runner. Strategies:
+
+- full:      plain `git clone` (default, same as before)
+- blobless:  --filter=blob:none, every commit and tree but no file contents until they are read
+- treeless:  --filter=tree:0, commits only; fine for `git log` but every tree read is a round trip
+- partial:   treeless for tt-metal (only its commit log is used), blobless for everything else
+
+With sparse, the checkout is limited to third_party/ (plus top-level files), so only those blobs are
+downloaded at clone time. Blobs missing from a blobless clone are fetched by git on first access,
+one round trip per object; prefetch_paths() fetches all versions of a few paths in one request.
+
+Select with --clone / --sparse where a tool has flags, or $INTEGRATION_TOOLS_CLONE / $INTEGRATION_TOOLS_SPARSE=1.
+
+Mirrors: with a mirror directory set (--mirror-dir, or $INTEGRATION_TOOLS_MIRRORS), every repo has one
+bare `git clone --mirror` there, shared by all tools and working directories. New clones borrow its
+objects with --reference (git alternates), and the mirror is fetched before a clone is created or
+fetched, so each object is downloaded and stored once per machine instead of once per checkout.
+A mirror is fetched at most once per process, and not at all if it was fetched in the last
+$INTEGRATION_TOOLS_MIRROR_TTL seconds (default 300) by any tool.
+
+Clones keep borrowing from the mirror, so the mirror must never lose an object: it is fetched without
+--prune, and gc is switched off in it (MIRROR_CONFIG) so force-pushed-away objects aren't pruned either.
+It only grows; delete it (and the clones using it) to reclaim space. --dissociate would avoid this, but
+would copy every object into each clone, which is what the mirror is there to prevent.
+"""
+import fcntl
+import os
+import subprocess
+import threading
+import time
+
+STRATEGIES = ["full", "blobless", "treeless", "partial"]
+FILTERS = {"blobless": "blob:none", "treeless": "tree:0"}
+PARTIAL_FILTERS = {"tt-metal": "tree:0"}  # strategy "partial": per-repo filter, blob:none otherwise
+
+SPARSE_PATHS = ["third_party"]
+
+strategy = os.environ.get("INTEGRATION_TOOLS_CLONE") or "full"
+sparse = os.environ.get("INTEGRATION_TOOLS_SPARSE") == "1"
+mirror_dir = os.environ.get("INTEGRATION_TOOLS_MIRRORS") or None
+MIRROR_TTL = int(os.environ.get("INTEGRATION_TOOLS_MIRROR_TTL", 300))
+
+# keep every object a borrowing clone may still need
+MIRROR_CONFIG = {"gc.auto": "0", "gc.autoDetach": "false", "gc.pruneExpire": "never", "fetch.prune": "false"}
+
+_mirrors_synced = set()
+_mirror_locks = {}
+_mirror_locks_guard = threading.Lock()
+
+
+def configure(clone=None, sparse_checkout=None, mirrors=None):
+    """
+    Override the environment defaults, e.g. from command line flags (None keeps the current value).
+    """
+    global strategy, sparse, mirror_dir
+    if clone is not None:
+        strategy = clone
+    if sparse_checkout is not None:
+        sparse = sparse_checkout
+    if mirrors is not None:
+        mirror_dir = os.path.abspath(os.path.expanduser(mirrors))
+
+
+def get_filter(repo_name=None):
+    """
+    The --filter spec used to clone repo_name under the current strategy, or None for a full clone.
+    """
+    if strategy == "partial":
+        return PARTIAL_FILTERS.get(repo_name, "blob:none")
+    return FILTERS.get(strategy)
+
+
+def clone_args(repo_name=None):
+    args = []
+    filter_spec = get_filter(repo_name)
+    if filter_spec:
+        args.append(f"--filter={filter_spec}")
+    if sparse:
+        args.append("--sparse")
+    return args
+
+
+def mirror_path(repo_name):
+    return os.path.join(mirror_dir, f"{repo_name}.git")
+
+
+def configure_mirror(path, **run_kwargs):
+    for key, value in MIRROR_CONFIG.items():
+        subprocess.run(["git", "-C", path, "config", key, value], check=True, **run_kwargs)
+
+
+def sync_mirror(repo_name, url, **run_kwargs):
+    """
+    Create or fetch the shared mirror of repo_name and return its path (None when mirrors are off).
+    Safe to call from several threads and processes; see the module docstring for when it actually fetches.
+    """
+    if not mirror_dir:
+        return None
+    path = mirror_path(repo_name)
+    with _mirror_locks_guard:
+        lock = _mirror_locks.setdefault(path, threading.Lock())
+    with lock:
+        if path in _mirrors_synced:
+            return path
+        os.makedirs(mirror_dir, exist_ok=True)
+        # serialize with other tools updating the same mirror
+        with open(path + ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            stamp = os.path.join(path, "FETCH_HEAD")
+            if not os.path.isdir(path):
+                print(f"Creating shared mirror {path}...")
+                subprocess.run(["git", "clone", "--mirror", url, path], check=True, **run_kwargs)
+                configure_mirror(path, **run_kwargs)
+                open(stamp, "w").close()
+            elif not os.path.exists(stamp) or time.time() - os.path.getmtime(stamp) > MIRROR_TTL:
+                print(f"Updating shared mirror {path}...")
+                # mirrors created before MIRROR_CONFIG existed get it here
+                configure_mirror(path, **run_kwargs)
+                subprocess.run(["git", "-C", path, "fetch", "origin"], check=True, **run_kwargs)
+        _mirrors_synced.add(path)
+    return path
+
+
+def uses_mirror(repo_path, repo_name):
+    """
+    True if the clone at repo_path borrows objects from repo_name's shared mirror.
+    """
+    if not mirror_dir:
+        return False
+    alternates = os.path.join(repo_path, ".git", "objects", "info", "alternates")
+    if not os.path.exists(alternates):
+        return False
+    target = os.path.realpath(os.path.join(mirror_path(repo_name), "objects"))
+    with open(alternates) as f:
+        return any(os.path.realpath(line.strip()) == target for line in f)
+
+
+def prepare_fetch(repo_path, repo_name, url, **run_kwargs):
+    """
+    Call before fetching an existing clone: if it borrows from a mirror, update the mirror first, so the
+    clone's own fetch finds the new objects there and only has to transfer refs.
+    """
+    if uses_mirror(repo_path, repo_name):
+        sync_mirror(repo_name, url, **run_kwargs)
+
+
+def clone(url, path, repo_name=None, extra_args=(), **run_kwargs):
+    """
+    `git clone` url into path with the current strategy. run_kwargs are passed to subprocess.run.
+    With mirrors on, the clone borrows the shared mirror's objects (--reference) instead of a partial filter.
+    """
+    repo_name = repo_name or os.path.basename(path.rstrip("/"))
+    mirror = sync_mirror(repo_name, url, **run_kwargs)
+    args = ["--reference", mirror, *(["--sparse"] if sparse else [])] if mirror else clone_args(repo_name)
+    subprocess.run(["git", "clone", *args, *extra_args, url, path], check=True, **run_kwargs)
+    if sparse:
+        subprocess.run(["git", "-C", path, "sparse-checkout", "set", *SPARSE_PATHS], check=True, **run_kwargs)
+
+
+def _config(repo_path, key):
+    result = subprocess.run(["git", "-C", repo_path, "config", "--get", key], capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def partial_filter(repo_path, remote="origin"):
+    """
+    The filter an existing clone was made with (e.g. "blob:none"), or None for a full clone.
+    """
+    if _config(repo_path, f"remote.{remote}.promisor") != "true":
+        return None
+    return _config(repo_path, f"remote.{remote}.partialclonefilter")
+
+
+def is_sparse(repo_path):
+    return _config(repo_path, "core.sparseCheckout") == "true"
+
+
+def missing_blobs(repo_path, rev_ranges, paths):
+    """
+    Object ids of the versions of paths, in the commits of rev_ranges, that aren't in the local object store.
+    Only walks trees, so call it on blobless clones (in a treeless clone every tree would be fetched).
+    Ranges that don't resolve (e.g. "root^..x") are skipped; git fetches what they need lazily.
+    """
+    missing = set()
+    for rev_range in rev_ranges:
+        result = subprocess.run(
+            ["git", "-C", repo_path, "rev-list", "--objects", "--missing=print", *rev_range.split(), "--", *paths],
+            capture_output=True, text=True)
+        missing.update(line[1:] for line in result.stdout.splitlines() if line.startswith("?"))
+    return sorted(missing)
+
+
+def prefetch_paths(repo_path, rev_ranges, paths, remote="origin"):
+    """
+    Fetch every missing version of paths in rev_ranges (e.g. ["abc^..def"]) with a single request,
+    instead of letting git fetch them lazily one object at a time. No-op unless repo_path is a blobless clone.
+    Returns the number of blobs fetched.
+    """
+    if partial_filter(repo_path, remote) != "blob:none":
+        return 0
+    oids = missing_blobs(repo_path, rev_ranges, paths)
+    if oids:
+        # the same request git makes for its own batched promisor fetches
+        subprocess.run(
+            ["git", "-C", repo_path, "-c", "fetch.negotiationAlgorithm=noop", "fetch", remote,
+             "--no-tags", "--no-write-fetch-head", "--recurse-submodules=no", "--filter=blob:none", "--stdin"],
+            input="\n".join(oids) + "\n", text=True, check=True, capture_output=True)
+    return len(oids)
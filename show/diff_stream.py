@@ -0,0 +1,108 @@
+"""
+Write a unified diff to disk as it streams in, and summarize it on the way.
+
+DiffSink takes raw chunks (from an HTTP response or a `git diff` pipe), writes them to the output
+file, optionally compressed, and counts added / removed lines per file from the same bytes. The
+summary is ready when the stream ends, so the (possibly huge) diff is never held in memory or
+read back from disk.
+"""
+import gzip
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for --compress zstd
+    zstandard = None
+
+COMPRESSORS = ["gzip", "zstd"]
+SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def open_output(out_file, compress=None, append=False):
+    """
+    Open out_file for binary writing, wrapped in a gzip / zstd compressor if requested.
+    """
+    if compress == "gzip":
+        return gzip.open(out_file, "ab" if append else "wb")
+    if compress == "zstd":
+        if zstandard is None:
+            raise SystemExit("Error: --compress zstd needs the 'zstandard' package (pip install zstandard)")
+        return zstandard.ZstdCompressor().stream_writer(open(out_file, "ab" if append else "wb"))
+    return open(out_file, "ab" if append else "wb")
+
+
+class DiffSummary:
+    """
+    Incremental per-file line counts of a unified diff: files maps path -> [added, removed].
+    """
+    def __init__(self):
+        self.files = {}
+        self._current = None
+        self._in_hunk = False
+        self._pending = b""
+
+    def feed(self, chunk):
+        *lines, self._pending = (self._pending + chunk).split(b"\n")
+        for line in lines:
+            self._line(line)
+
+    def finish(self):
+        if self._pending:
+            self._line(self._pending)
+            self._pending = b""
+
+    def _line(self, line):
+        if line.startswith(b"diff --git "):
+            path = line.rsplit(b" b/", 1)[-1].decode(errors="replace")
+            self._current = self.files.setdefault(path, [0, 0])
+            self._in_hunk = False
+        elif line.startswith(b"@@"):
+            self._in_hunk = True
+        elif self._in_hunk and self._current is not None:
+            # inside a hunk "--- x" is a removed line, not a file header
+            if line.startswith(b"+"):
+                self._current[0] += 1
+            elif line.startswith(b"-"):
+                self._current[1] += 1
+
+    @property
+    def added(self):
+        return sum(a for a, _ in self.files.values())
+
+    @property
+    def removed(self):
+        return sum(r for _, r in self.files.values())
+
+    def describe(self):
+        return f"{len(self.files)} files changed, {self.added} insertions(+), {self.removed} deletions(-)"
+
+
+class DiffSink:
+    """
+    Streamed diff output: write() each chunk, close() at the end, then read .summary.
+    append=True continues a partial uncompressed file (resume); its existing content is
+    fed to the summary first.
+    """
+    def __init__(self, out_file, compress=None, append=False):
+        self.summary = DiffSummary()
+        self.bytes_written = 0
+        if append:
+            with open(out_file, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 16), b""):
+                    self.summary.feed(chunk)
+                    self.bytes_written += len(chunk)
+        self.out = open_output(out_file, compress, append)
+
+    def write(self, chunk):
+        self.out.write(chunk)
+        self.summary.feed(chunk)
+        self.bytes_written += len(chunk)
+
+    def close(self):
+        self.out.close()
+        self.summary.finish()
+
+    def write_summary_csv(self, path):
+        with open(path, "w") as f:
+            f.write("File,Added,Removed\n")
+            for name, (added, removed) in self.summary.files.items():
+                f.write(f"\"{name}\",{added},{removed}\n")
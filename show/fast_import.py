@@ -0,0 +1,79 @@
+"""
+Write a chain of synthetic commits through a single `git fast-import` process.
+
+Every commit starts from an existing tree (`M 040000 <tree> ""` replaces the root) and then overrides a
+few paths: an inline blob for a rewritten CMakeLists.txt, or a gitlink. The whole branch is one stream
+into one process, instead of several git invocations per commit.
+"""
+import os
+import subprocess
+import tempfile
+
+import tree_edit
+
+GITLINK_MODE = 0o160000
+
+
+class FastImportWriter:
+    """
+    Stream commits onto refs/heads/<branch>, starting on top of parent_hexsha.
+    The ref and all objects are only written when close() is called.
+    """
+    def __init__(self, repo, branch, parent_hexsha):
+        self.branch = branch
+        self.parent = parent_hexsha
+        self.next_mark = 1
+        self.marks_dir = tempfile.TemporaryDirectory(prefix="uplift-fast-import-")
+        self.marks_path = os.path.join(self.marks_dir.name, "marks")
+        # --force: the branch is rebuilt, so its new tip is usually not a descendant of the old one
+        self.proc = repo.git.fast_import("--quiet", "--force", "--done", f"--export-marks={self.marks_path}",
+                                         as_process=True, istream=subprocess.PIPE)
+
+    def _write(self, data):
+        self.proc.stdin.write(data if isinstance(data, bytes) else data.encode())
+
+    def _write_data(self, data):
+        data = data if isinstance(data, bytes) else data.encode()
+        self._write(f"data {len(data)}\n")
+        self._write(data)
+        self._write("\n")
+
+    def commit(self, root_tree, changes, message, author, committer, author_date, commit_date):
+        """
+        Queue one commit on top of the previous one and return its mark (":N").
+        changes: list of (path, mode, content) where content is blob data, or a commit hexsha for gitlinks.
+        """
+        mark = f":{self.next_mark}"
+        self.next_mark += 1
+        self._write(f"commit refs/heads/{self.branch}\nmark {mark}\n")
+        self._write(f"author {tree_edit.format_signature(author, author_date)}\n")
+        self._write(f"committer {tree_edit.format_signature(committer, commit_date)}\n")
+        self._write_data(message)
+        self._write(f"from {self.parent}\n")
+        self._write(f'M 040000 {root_tree} ""\n')
+        for path, mode, content in changes:
+            if mode == GITLINK_MODE:
+                self._write(f"M 160000 {content} {path}\n")
+            else:
+                self._write(f"M {mode:06o} inline {path}\n")
+                self._write_data(content)
+        self._write("\n")
+        self.parent = mark
+        return mark
+
+    def close(self):
+        """
+        Finish the stream, wait for fast-import, and return {mark: commit hexsha}.
+        Raises GitCommandError if fast-import failed.
+        """
+        self._write("done\n")
+        self.proc.stdin.close()
+        self.proc.wait()
+        marks = {}
+        if os.path.exists(self.marks_path):
+            with open(self.marks_path) as f:
+                for line in f:
+                    mark, hexsha = line.split()
+                    marks[mark] = hexsha
+        self.marks_dir.cleanup()
+        return marks
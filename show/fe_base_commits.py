@@ -13,11 +13,14 @@ tt-xla                         | 8f318886f6cb299a753f5dff1bbf0e5083c4dfd5 | 8f31
 tt-forge-fe                    | 17e1c32cd023ab1541ae56a8cdf9c6cb715e130e | 17e1c32cd | Saber Gholami | 2025-09-02 17:25:39 -0400 | [Optimizer] Add constraint API for memory management ops (#4734)
 '''
 
-import os
 import subprocess
-import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import clone_strategy
+import pinned_versions
+
 REPOS = {
     # "tt-torch": "https://github.com/tenstorrent/tt-torch.git",
     "tt-xla": "https://github.com/tenstorrent/tt-xla.git",
@@ -25,45 +28,63 @@ REPOS = {
     "tt-mlir": "https://github.com/tenstorrent/tt-mlir.git",
 }
 
-def clone_or_pull(repo_name, url):
+def clone_or_pull(repo_name, url, **run_kwargs):
     if repo_name == "tt-mlir" or repo_name == "tt-xla":
         # Always clone or pull with full history for tt-mlir and xla
         if not Path(repo_name).exists():
             print(f"Cloning {repo_name} (full)...")
-            subprocess.run(["git", "clone", url, repo_name], check=True)
+            clone_strategy.clone(url, repo_name, **run_kwargs)
         else:
             print(f"Pulling {repo_name} (full)...")
-            subprocess.run(["git", "-C", repo_name, "fetch"], check=True)
+            clone_strategy.prepare_fetch(repo_name, repo_name, url, **run_kwargs)
+            # --all: tt-mlir commits pinned by the FEs may only be on other remotes
+            fetch_args = ["--all"] if repo_name == "tt-mlir" else []
+            subprocess.run(["git", "-C", repo_name, "fetch", *fetch_args], check=True, **run_kwargs)
     else:
         # Shallow clone for other repos
         if not Path(repo_name).exists():
             print(f"Cloning {repo_name} (shallow)...")
-            subprocess.run(["git", "clone", "--depth", "1", url, repo_name], check=True)
+            clone_strategy.clone(url, repo_name, extra_args=["--depth", "1"], **run_kwargs)
         else:
             print(f"Pulling {repo_name}...")
-            subprocess.run(["git", "-C", repo_name, "fetch"], check=True)
+            clone_strategy.prepare_fetch(repo_name, repo_name, url, **run_kwargs)
+            subprocess.run(["git", "-C", repo_name, "fetch"], check=True, **run_kwargs)
+
+def sync_repo(repo_name, url):
+    """
+    clone_or_pull one repo with git's output captured, so several can run side by side.
+    Returns the seconds it took; raises CalledProcessError (with git's output in .output) on failure.
+    """
+    start = time.perf_counter()
+    clone_or_pull(repo_name, url, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    return time.perf_counter() - start
+
+def sync_all_repos(repos=REPOS):
+    """
+    Clone / fetch every repo exactly once, all in parallel, and print how long each one took.
+    """
+    start = time.perf_counter()
+    failed = []
+    with ThreadPoolExecutor(max_workers=len(repos)) as pool:
+        futures = {pool.submit(sync_repo, name, url): name for name, url in repos.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                print(f"  {name:<15} synced in {future.result():.1f}s")
+            except subprocess.CalledProcessError as e:
+                print(f"  {name:<15} FAILED: {' '.join(e.cmd)}\n{e.output or ''}")
+                failed.append(name)
+    print(f"Synced {len(repos)} repos in {time.perf_counter() - start:.1f}s")
+    if failed:
+        raise SystemExit(f"Error: failed to sync {', '.join(failed)}")
 
 def get_mlir_commit_from_cmakelists(repo_dir):
-    cmake_path = Path(repo_dir) / "third_party" / "CMakeLists.txt"
-    if not cmake_path.exists():
-        return None
-    with open(cmake_path) as f:
-        for line in f:
-            m = re.search(r'set\(TT_MLIR_VERSION\s+"([0-9a-f]+)"\)', line)
-            if m:
-                return m.group(1)
-    return None
+    # TT_MLIR_VERSION pinned at HEAD, from the tree (see pinned_versions.py)
+    return pinned_versions.pins_at(repo_dir).get("TT_MLIR_VERSION")
 
 def get_mlir_commit_from_submodule(repo_dir):
-    submodule_path = Path(repo_dir) / "third_party" / "tt-mlir"
-    if not submodule_path.exists():
-        return None
-    # Get the commit hash the submodule is on
-    result = subprocess.run(
-        ["git", "-C", str(submodule_path), "rev-parse", "HEAD"],
-        capture_output=True, text=True, check=True
-    )
-    return result.stdout.strip()
+    # The third_party/tt-mlir gitlink at HEAD; doesn't need the submodule checked out
+    return pinned_versions.pins_at(repo_dir).get(pinned_versions.MLIR_SUBMODULE_PATH)
 
 def get_commit_details(mlir_dir, commit):
     result = subprocess.run(
@@ -73,23 +94,17 @@ def get_commit_details(mlir_dir, commit):
     return result.stdout.strip()
 
 def main():
-    # Clone or pull all repos
-    for name, url in REPOS.items():
-        clone_or_pull(name, url)
-
-    # Always pull latest tt-mlir
-    subprocess.run(["git", "-C", "tt-mlir", "fetch", "--all"], check=True)
+    # Clone or pull all repos, once each and concurrently (tt-mlir is fetched with --all)
+    sync_all_repos()
+    pinned_versions.open_cache()
 
     report = []
 
     # Handle other repos
     for repo in ["tt-xla", "tt-forge-fe"]:
         if repo == "tt-xla":
-            clone_or_pull('tt-xla', REPOS['tt-xla'])
             commit = get_mlir_commit_from_cmakelists(repo)
         elif repo == "tt-forge-fe":
-            # Make sure submodules are initialized
-            subprocess.run(["git", "-C", repo, "submodule", "update", "--init", "--depth", "1"], check=True)
             commit = get_mlir_commit_from_submodule(repo)
         else:
             commit = None
@@ -108,6 +123,7 @@ def main():
         else:
             details = "N/A"
         report.append((repo, commit or "N/A", details))
+    pinned_versions.flush_cache()
 
     # Print table
     print('\n')
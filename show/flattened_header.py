@@ -0,0 +1,33 @@
+"""
+The orig_fe / orig_mlir / orig_metal header of flattened uplift branch commits (see uplift_history.py).
+
+uplift_history.py writes it and prints it back via print_flattened_uplift_table; run/ci_bisect.py reads it.
+"""
+import re
+
+FLATTENED_HEADER_RE = re.compile(r"orig_fe=([0-9a-f]+|None) \| orig_mlir=([0-9a-f]+|None) \| orig_metal=([0-9a-f]+|None)")
+
+
+def flattened_commit_message(fe_commit, mlir_commit, metal_commit):
+    """
+    Commit message for an entry of a flattened branch: an orig_fe/orig_mlir/orig_metal header
+    (parsed back by parse_flattened_header) followed by the original subjects.
+    """
+    short = lambda c: c.hexsha[:8] if c else 'None'
+    msg = f"orig_fe={short(fe_commit)} | orig_mlir={short(mlir_commit)} | orig_metal={short(metal_commit)}"
+    body = []
+    for tag, commit in [("FE", fe_commit), ("MLIR", mlir_commit), ("METAL", metal_commit)]:
+        if commit:
+            body.append(f"[{tag}:{commit.hexsha[:8]}] {commit.message.splitlines()[0]}")
+    return msg + "\n\n" + "\n".join(body)
+
+
+def parse_flattened_header(message):
+    """
+    Parse the orig_fe/orig_mlir/orig_metal header written by flattened_commit_message.
+    Returns (orig_fe, orig_mlir, orig_metal) short hashes ('None' fields become None), or None if absent.
+    """
+    m = FLATTENED_HEADER_RE.search(message)
+    if not m:
+        return None
+    return tuple(None if v == 'None' else v for v in m.groups())
@@ -0,0 +1,98 @@
+"""
+Streaming commit-range reader built on a single `git log -z` subprocess per range.
+
+GitPython's repo.iter_commits() yields Commit objects whose .message / .author / .committed_datetime
+are read lazily, one object at a time. Here every field the tools print is requested up front in one
+`git log` call and parsed as the output streams in, into small __slots__ records.
+
+CommitRecord mirrors the parts of git.Commit used in this repo (hexsha, message, author, committer,
+authored_datetime, committed_datetime, parents, tree), so it can be passed anywhere a Commit was.
+"""
+from datetime import datetime
+
+import git
+
+FIELD_SEP = "\x1f"
+LOG_FIELDS = ["%H", "%P", "%an", "%ae", "%aI", "%cn", "%ce", "%cI", "%B"]
+LOG_FORMAT = "%x1f".join(LOG_FIELDS)
+
+READ_CHUNK = 1 << 16
+
+
+class CommitRecord:
+    __slots__ = (
+        "repo", "hexsha", "parent_shas",
+        "author_name", "author_email", "authored_date",
+        "committer_name", "committer_email", "committed_date",
+        "message",
+    )
+
+    def __init__(self, repo, fields):
+        self.repo = repo
+        (self.hexsha, parents,
+         self.author_name, self.author_email, self.authored_date,
+         self.committer_name, self.committer_email, self.committed_date,
+         self.message) = fields
+        self.parent_shas = parents.split()
+
+    def __repr__(self):
+        return f"<CommitRecord {self.hexsha[:8]} {self.summary!r}>"
+
+    @property
+    def summary(self):
+        return self.message.split("\n", 1)[0]
+
+    @property
+    def author(self):
+        return git.Actor(self.author_name, self.author_email)
+
+    @property
+    def committer(self):
+        return git.Actor(self.committer_name, self.committer_email)
+
+    @property
+    def authored_datetime(self):
+        return datetime.fromisoformat(self.authored_date)
+
+    @property
+    def committed_datetime(self):
+        return datetime.fromisoformat(self.committed_date)
+
+    @property
+    def parents(self):
+        return [self.repo.commit(sha) for sha in self.parent_shas]
+
+    @property
+    def tree(self):
+        return self.repo.tree(self.hexsha)
+
+
+def iter_commits(repo, rev_range, *log_args):
+    """
+    Yield CommitRecords for `git log <log_args> <rev_range>`, newest first (same order as repo.iter_commits).
+    Raises git.exc.GitCommandError if the range can't be resolved.
+    Closing the generator early (break, next(), garbage collection) kills and reaps the git process.
+    """
+    proc = repo.git.log("-z", f"--format={LOG_FORMAT}", *log_args, rev_range, "--", as_process=True)
+    finished = False
+    try:
+        pending = b""
+        for chunk in iter(lambda: proc.stdout.read(READ_CHUNK), b""):
+            pending += chunk
+            *records, pending = pending.split(b"\0")
+            for raw in records:
+                yield _parse_record(repo, raw)
+        if pending:
+            yield _parse_record(repo, pending)
+        finished = True
+        proc.wait()
+    finally:
+        if not finished:
+            proc.stdout.close()
+            proc.proc.kill()
+            proc.proc.wait()
+
+
+def _parse_record(repo, raw):
+    fields = raw.decode("utf-8", errors="replace").split(FIELD_SEP, len(LOG_FIELDS) - 1)
+    return CommitRecord(repo, fields)
@@ -0,0 +1,213 @@
+"""
+Shared GitHub REST client for the integration tools.
+
+- one pooled requests.Session per process, authenticated with $GITHUB_TOKEN (or $GH_TOKEN) when set
+- transparent pagination: follows the Link: rel="next" header and concatenates the pages
+- conditional requests: responses are cached on disk with their ETag / Last-Modified
+  (<cache dir>/github, see cache_paths.py), a 304 answer is served from the cache and
+  doesn't count against the rate limit
+- rate-limit aware: waits for X-RateLimit-Reset / Retry-After on 403/429 and retries 5xx with backoff
+
+Errors are raised as requests.HTTPError.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cache_paths import get_cache_dir
+
+API_URL = "https://api.github.com"
+
+MAX_RETRIES = 5
+MAX_RATE_LIMIT_WAIT = 15 * 60  # seconds; give up rather than block a run for longer
+PER_PAGE = 100
+DEFAULT_RATE_LIMIT_WAIT = 60  # seconds, when Retry-After can't be parsed (GitHub's advice: wait at least a minute)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_token():
+    return os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
+
+
+def get_session():
+    """
+    Return the process-wide session (created on first use).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+            session.headers["Accept"] = "application/vnd.github+json"
+            session.headers["X-GitHub-Api-Version"] = "2022-11-28"
+            _session = session
+    return _session
+
+
+def api_url(path_or_url):
+    if "://" in path_or_url:
+        return path_or_url
+    return f"{API_URL}/{path_or_url.lstrip('/')}"
+
+
+def _cache_path(url, accept):
+    key = hashlib.sha256(f"{accept} {url}".encode()).hexdigest()
+    return os.path.join(get_cache_dir("github"), key + ".json")
+
+
+def _load_cached(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_cached(path, resp):
+    entry = {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "link": resp.headers.get("Link"),
+        "body": resp.text,
+    }
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(entry, f)
+    os.replace(tmp, path)
+
+
+def _rate_limit_wait(resp):
+    """
+    Seconds to wait before retrying a throttled response, or None if it isn't a rate limit.
+    """
+    if resp.status_code not in (403, 429):
+        return None
+    if "Retry-After" in resp.headers:
+        return _retry_after_seconds(resp.headers["Retry-After"])
+    if resp.headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in resp.headers:
+        return max(int(resp.headers["X-RateLimit-Reset"]) - time.time(), 0) + 1
+    return None
+
+
+def _retry_after_seconds(value):
+    """
+    Retry-After is either delay-seconds or an HTTP-date (RFC 9110).
+    """
+    try:
+        return max(int(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0) + 1
+    except (TypeError, ValueError):
+        return DEFAULT_RATE_LIMIT_WAIT
+
+
+def _auth_headers(url, headers):
+    """
+    Add the bearer token for api.github.com only; other hosts (e.g. github.com .diff downloads) never get it.
+    """
+    token = get_token()
+    if not token or urlsplit(url).hostname != urlsplit(API_URL).hostname:
+        return headers
+    return {"Authorization": f"Bearer {token}", **(headers or {})}
+
+
+def request(method, url, **kwargs):
+    """
+    session.request() with rate-limit waits and retries of transient (5xx / connection) failures.
+    The token is only sent to the API host. Returns the final response without checking its status.
+    """
+    session = get_session()
+    kwargs["headers"] = _auth_headers(url, kwargs.get("headers"))
+    for attempt in range(MAX_RETRIES):
+        try:
+            resp = session.request(method, url, **kwargs)
+        except requests.ConnectionError:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            time.sleep(2 ** attempt)
+            continue
+        wait = _rate_limit_wait(resp)
+        if wait is None and resp.status_code >= 500:
+            wait = 2 ** attempt
+        if wait is None or attempt == MAX_RETRIES - 1:
+            return resp
+        if wait > MAX_RATE_LIMIT_WAIT:
+            print(f"GitHub rate limit resets in {wait:.0f}s, not waiting (set GITHUB_TOKEN for a higher limit)")
+            return resp
+        if resp.status_code in (403, 429):
+            print(f"GitHub rate limit hit, retrying in {wait:.0f}s...")
+        resp.close()
+        time.sleep(wait)
+    return resp
+
+
+def get(path_or_url, params=None, accept=None, cache=True):
+    """
+    Conditional GET. Returns (text, link_header); raises requests.HTTPError on failure.
+    """
+    url = requests.Request("GET", api_url(path_or_url), params=params).prepare().url
+    headers = {"Accept": accept} if accept else {}
+    cache_path = _cache_path(url, accept) if cache else None
+    cached = _load_cached(cache_path) if cache_path else None
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    resp = request("GET", url, headers=headers)
+    if resp.status_code == 304 and cached:
+        return cached["body"], cached.get("link")
+    resp.raise_for_status()
+    if cache_path and (resp.headers.get("ETag") or resp.headers.get("Last-Modified")):
+        _store_cached(cache_path, resp)
+    return resp.text, resp.headers.get("Link")
+
+
+def get_json(path_or_url, params=None):
+    text, _ = get(path_or_url, params)
+    return json.loads(text)
+
+
+def _next_link(link_header):
+    if not link_header:
+        return None
+    links = requests.utils.parse_header_links(link_header)
+    return next((l["url"] for l in links if l.get("rel") == "next"), None)
+
+
+def get_paginated(path_or_url, params=None, items_key=None):
+    """
+    Fetch every page of a list endpoint and return the concatenated items.
+    items_key: for endpoints whose pages are objects (e.g. "commits" for compare), the list to collect.
+    With items_key, the first page's object is returned with that list replaced by all collected items.
+    """
+    params = dict(params or {}, per_page=PER_PAGE)
+    url = api_url(path_or_url)
+    first = None
+    items = []
+    while url:
+        text, link = get(url, params)
+        page = json.loads(text)
+        if items_key:
+            first = first or page
+            items.extend(page.get(items_key, []))
+        else:
+            items.extend(page)
+        url = _next_link(link)
+        params = None  # the next link already carries the query string
+    if items_key:
+        first = dict(first or {})
+        first[items_key] = items
+        return first
+    return items
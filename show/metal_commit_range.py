@@ -1,18 +1,82 @@
 #!/usr/bin/env python3
 import sys
+import os
+import argparse
 import requests
-import csv
+from datetime import timezone
 
-GITHUB_API = "https://api.github.com/repos/tenstorrent/tt-metal/compare"
+import git
+
+import diff_stream
+import git_log
+import github_client
+
+GITHUB_API = "repos/tenstorrent/tt-metal/compare"
 GITHUB_DIFF = "https://github.com/tenstorrent/tt-metal/compare"
 
+# tt-metal clones to look in, in order (uplift_history.py keeps one in the directory it runs from)
+LOCAL_REPO_CANDIDATES = [os.environ.get("TT_METAL_REPO"), "tt-metal"]
+
+DIFF_CHUNK = 1 << 16
+DIFF_ATTEMPTS = 4
+
+def find_local_repo(from_commit, to_commit, candidates=LOCAL_REPO_CANDIDATES):
+    """
+    Return a git.Repo for the first local tt-metal clone that has both endpoints, or None.
+    """
+    for path in candidates:
+        if not path or not os.path.isdir(path):
+            continue
+        try:
+            repo = git.Repo(path)
+            for rev in (from_commit, to_commit):
+                repo.git.rev_parse("--verify", "--quiet", f"{rev}^{{commit}}")
+        except (git.exc.InvalidGitRepositoryError, git.exc.GitCommandError):
+            continue
+        return repo
+    return None
+
+def local_fetch_commits(repo, from_commit, to_commit):
+    """
+    Same records as fetch_commits, read from a local clone (oldest first, like the compare API).
+    """
+    commits = []
+    for c in git_log.iter_commits(repo, f"{from_commit}..{to_commit}", "--reverse"):
+        # the compare API reports author dates in UTC
+        date = c.authored_datetime.astimezone(timezone.utc).strftime("%Y-%m-%d")
+        message = c.summary.replace('"', "'")
+        commits.append({
+            "date": date,
+            "hash": c.hexsha[:7],
+            "author": c.author_name,
+            "message": message,
+            "longsha": c.hexsha
+        })
+    return commits
+
+def local_save_diff(repo, from_commit, to_commit, out_file, compress=None):
+    """
+    Stream `git diff from...to` (the same three-dot diff GitHub's compare .diff shows) into out_file.
+    Returns the DiffSink, whose .summary has the per-file line counts.
+    """
+    proc = repo.git.diff("--no-color", "--no-ext-diff", f"{from_commit}...{to_commit}", as_process=True)
+    sink = diff_stream.DiffSink(out_file, compress)
+    for chunk in iter(lambda: proc.stdout.read(DIFF_CHUNK), b""):
+        sink.write(chunk)
+    sink.close()
+    proc.wait()
+    print(f"Diff written to {out_file}")
+    return sink
+
 def fetch_commits(from_commit, to_commit):
-    url = f"{GITHUB_API}/{from_commit}...{to_commit}"
-    resp = requests.get(url)
-    if resp.status_code != 200:
-        print(f"Failed to fetch commits: {resp.status_code} {resp.text}")
+    try:
+        # compare returns at most 250 commits unless paginated
+        data = github_client.get_paginated(f"{GITHUB_API}/{from_commit}...{to_commit}", items_key="commits")
+    except requests.HTTPError as e:
+        print(f"Failed to fetch commits: {e.response.status_code} {e.response.text}")
         sys.exit(1)
-    data = resp.json()
+    if len(data["commits"]) < data.get("total_commits", 0):
+        print(f"Warning: GitHub returned {len(data['commits'])} of {data['total_commits']} commits", file=sys.stderr)
     commits = []
     for c in data.get("commits", []):
         date = c["commit"]["author"]["date"][:10]
@@ -29,29 +93,91 @@ def fetch_commits(from_commit, to_commit):
         })
     return commits
 
-def fetch_and_save_diff(from_commit, to_commit, out_file):
+def fetch_and_save_diff(from_commit, to_commit, out_file, compress=None):
+    """
+    Stream the compare .diff into out_file chunk by chunk, via <out_file>.part.
+    Uncompressed downloads resume with a Range request if the connection drops, or if a .part file
+    is left over from an interrupted run. Returns the DiffSink (see diff_stream.py), or None on failure.
+    """
     url = f"{GITHUB_DIFF}/{from_commit}...{to_commit}.diff"
-    resp = requests.get(url)
-    if resp.status_code == 200:
-        with open(out_file, "w") as f:
-            f.write(resp.text)
+    part_file = out_file + ".part"
+    for attempt in range(DIFF_ATTEMPTS):
+        offset = os.path.getsize(part_file) if compress is None and os.path.exists(part_file) else 0
+        headers = {"Accept": "*/*"}
+        if compress is None:
+            # byte offsets only line up with the file on disk without transfer compression
+            headers["Accept-Encoding"] = "identity"
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        resp = github_client.request("GET", url, headers=headers, stream=True)
+        if resp.status_code == 416:
+            # stale .part file, start over
+            resp.close()
+            os.remove(part_file)
+            continue
+        if resp.status_code not in (200, 206):
+            print(f"Failed to fetch diff: {resp.status_code}")
+            return None
+        resume = resp.status_code == 206
+        if resume and not resp.headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+            # a partial answer for some other range would corrupt the file: start over
+            print(f"Unexpected Content-Range {resp.headers.get('Content-Range')!r} for byte {offset}, restarting the download")
+            resp.close()
+            os.remove(part_file)
+            continue
+        if resume:
+            print(f"Resuming diff download at byte {offset}")
+        sink = diff_stream.DiffSink(part_file, compress, append=resume)
+        try:
+            for chunk in resp.iter_content(DIFF_CHUNK):
+                sink.write(chunk)
+        except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+            print(f"Diff download interrupted after {sink.bytes_written} bytes ({e}), retrying...")
+            continue
+        finally:
+            sink.close()
+            resp.close()
+        os.replace(part_file, out_file)
         print(f"Diff written to {out_file}")
-    else:
-        print(f"Failed to fetch diff: {resp.status_code}")
+        return sink
+    print(f"Failed to fetch diff: gave up after {DIFF_ATTEMPTS} attempts")
+    return None
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python metal_commit_range.py <from_commit> <to_commit>")
-        sys.exit(1)
-    from_commit, to_commit = sys.argv[1:3]
+    parser = argparse.ArgumentParser(description="Print tt-metal commits between two commits as CSV and save their diff")
+    parser.add_argument("from_commit")
+    parser.add_argument("to_commit")
+    parser.add_argument("--repo", help="Local tt-metal clone to read from (default: $TT_METAL_REPO, then ./tt-metal)")
+    parser.add_argument("--remote", action="store_true", help="Always use the GitHub API, even if a local clone has both commits")
+    parser.add_argument("--compress", choices=diff_stream.COMPRESSORS, help="Compress the .diff while writing it (zstd needs the zstandard package)")
+    parser.add_argument("--summary", metavar="CSV", help="Also write per-file added/removed line counts of the diff to CSV")
+    args = parser.parse_args()
+    from_commit, to_commit = args.from_commit, args.to_commit
 
-    commits = fetch_commits(from_commit, to_commit)
+    repo = None
+    if not args.remote:
+        repo = find_local_repo(from_commit, to_commit, [args.repo] if args.repo else LOCAL_REPO_CANDIDATES)
+        if args.repo and repo is None:
+            print(f"Warning: {args.repo} doesn't contain both {from_commit} and {to_commit}, using the GitHub API", file=sys.stderr)
+    if repo is not None:
+        print(f"Using local clone {repo.working_dir}", file=sys.stderr)
+        commits = local_fetch_commits(repo, from_commit, to_commit)
+    else:
+        commits = fetch_commits(from_commit, to_commit)
     print("Date,Commit,Author,Message,Link")
     for commit in commits:
         print(f"{commit['date']},{commit['hash']},{commit['author']},\"{commit['message']}\",https://github.com/tenstorrent/tt-metal/commit/{commit['longsha']}")
 
-    out_file = f"diff_from_{from_commit}_to_{to_commit}.diff"
-    fetch_and_save_diff(from_commit, to_commit, out_file)
+    out_file = f"diff_from_{from_commit}_to_{to_commit}.diff" + diff_stream.SUFFIXES[args.compress]
+    if repo is not None:
+        sink = local_save_diff(repo, from_commit, to_commit, out_file, args.compress)
+    else:
+        sink = fetch_and_save_diff(from_commit, to_commit, out_file, args.compress)
+    if sink is not None:
+        print(f"Diff summary: {sink.summary.describe()}")
+        if args.summary:
+            sink.write_summary_csv(args.summary)
+            print(f"Per-file summary written to {args.summary}")
 
 if __name__ == "__main__":
     main()
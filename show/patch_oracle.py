@@ -0,0 +1,129 @@
+"""
+Build oracle for hunk placement (uplift_history.py --patch-oracle).
+
+A clean `git apply` says where a fix-up hunk can go, not where it is needed: a fix-up for an API that
+tt-metal commit C changed also applies at A and B. The oracle is a user command (a targeted compile of
+the hunk's file, a grep for the new API, a local mock, ...) run in a checkout of a candidate entry's
+tree, i.e. the uplift commit's parent plus the hunks placed so far plus this hunk, with the metal pin of
+that position. Exit code 0 means the hunk belongs there (or earlier); anything else means it is too early.
+
+Probes run in a pool of detached `git worktree`s, one per job, reused between probes (`read-tree -u`
+only rewrites the files that differ, so incremental builds stay warm). Verdicts are stored in SQLite keyed
+by (command, tree, patch id): the tree already includes the pins and the hunk, so a point is never
+evaluated twice, across runs either.
+
+Default cache location: <cache dir>/patch_oracle.sqlite (see cache_paths.py).
+"""
+import os
+import queue
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+
+from cache_paths import get_cache_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS oracle_verdicts (
+    command  TEXT NOT NULL,
+    tree     TEXT NOT NULL,
+    patch_id TEXT NOT NULL,
+    ok       INTEGER NOT NULL,
+    PRIMARY KEY (command, tree, patch_id)
+);
+"""
+
+
+def default_cache_path():
+    return os.path.join(get_cache_dir(), "patch_oracle.sqlite")
+
+
+def patch_id(repo, patch_text):
+    """
+    `git patch-id --stable` of a patch: the same for the same change whatever its line numbers.
+    """
+    res = subprocess.run(["git", "-C", repo.working_dir, "patch-id", "--stable"],
+                         input=patch_text, capture_output=True, text=True, check=True)
+    return res.stdout.split(" ", 1)[0] or None
+
+
+class PatchOracle:
+    """
+    Evaluates `command` for (entry tree, hunk) pairs with cached verdicts, in one worktree per concurrent
+    caller. Call close() when done to remove the worktrees.
+    """
+    def __init__(self, repo, command, cache_path=None):
+        self.repo = repo
+        self.command = command
+        self.runs = self.cached = 0
+        self._conn = sqlite3.connect(cache_path or default_cache_path(), check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._idle = queue.SimpleQueue()
+        self._worktrees = []
+        self._tmp = None
+
+    def _lookup(self, tree, pid):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ok FROM oracle_verdicts WHERE command = ? AND tree = ? AND patch_id = ?",
+                (self.command, tree, pid),
+            ).fetchone()
+            self.cached += row is not None
+        return None if row is None else bool(row[0])
+
+    def _record(self, tree, pid, ok):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO oracle_verdicts (command, tree, patch_id, ok) VALUES (?, ?, ?, ?)",
+                (self.command, tree, pid, int(ok)),
+            )
+            self._conn.commit()
+            self.runs += 1
+
+    def _acquire_worktree(self, commit_hexsha):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._tmp is None:
+                self._tmp = tempfile.mkdtemp(prefix="uplift-oracle-")
+            path = os.path.join(self._tmp, f"wt-{len(self._worktrees)}")
+            self.repo.git.worktree("add", "--detach", path, commit_hexsha)
+            self._worktrees.append(path)
+        return path
+
+    def evaluate(self, tree, patch, env):
+        """
+        Verdict of the command on tree for patch (a hunk already applied in tree). env is added to the
+        command's environment (PROBE_TREE is always set); the command runs at the root of a checkout of tree.
+        """
+        pid = patch_id(self.repo, patch) or tree
+        verdict = self._lookup(tree, pid)
+        if verdict is not None:
+            return verdict
+        path = self._acquire_worktree(env.get("PROBE_MLIR", "HEAD"))
+        try:
+            subprocess.run(["git", "-C", path, "read-tree", "--reset", "-u", tree], check=True, capture_output=True)
+            start = time.perf_counter()
+            res = subprocess.run(self.command, shell=True, cwd=path, capture_output=True, text=True,
+                                 env={**os.environ, **env, "PROBE_TREE": tree})
+            verdict = res.returncode == 0
+            print(f"    oracle {env.get('PROBE_POSITION', '?')}/{env.get('PROBE_POSITIONS', '?')} "
+                  f"{env.get('PROBE_PATH', '')}: {'ok' if verdict else f'exit {res.returncode}'} "
+                  f"({time.perf_counter() - start:.1f}s)")
+        finally:
+            self._idle.put(path)
+        self._record(tree, pid, verdict)
+        return verdict
+
+    def close(self):
+        for path in self._worktrees:
+            self.repo.git.worktree("remove", "--force", path)
+        if self._tmp:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+        self._conn.close()
+        print(f"Patch oracle: {self.runs} probe(s) run, {self.cached} answered from the cache")
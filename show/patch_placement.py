@@ -0,0 +1,156 @@
+"""
+Place the fix-up hunks of an uplift commit among its flattened sub-commits.
+
+An uplift commit U (e.g. a tt-mlir commit uplifting tt-metal A..D) is flattened into one entry per
+uplifted commit, and every entry used to get U's whole tree, fix-ups included: a fix-up only valid
+after C was also applied at A and B (see the note at the end of uplift_history.py). Here U's diff
+against its parent is split into hunks, and each hunk gets a position: entry i's tree is U's parent
+tree plus every hunk placed at or before i, and the last entry's tree is always U's own.
+
+A hunk goes to the earliest position where it applies cleanly (`git apply --check --cached` against
+the entry's tree, built in a throwaway index, never touching a checkout) and where an optional accept
+callback agrees. Positions are binary searched, so a hunk costs O(log n) checks instead of n; with
+jobs > 1 each round checks that many evenly spaced positions at once (for slow callbacks, e.g. a build).
+Hunks are placed in diff order; a hunk whose context comes from another hunk can only go where that
+one already is, so dependent hunks stay in order.
+"""
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import git
+
+import pinned_versions
+
+FILE_HEADER_RE = re.compile(r"^diff --git ", re.M)
+HUNK_HEADER_RE = re.compile(r"^@@ ", re.M)
+
+
+def split_hunks(diff_text):
+    """
+    Split a `git diff` into standalone patches of one hunk each (file header + hunk). Sections without
+    text hunks (new / deleted empty files, mode changes, binary patches, gitlinks) are kept whole.
+    Returns a list of (path, patch_text).
+    """
+    hunks = []
+    starts = [m.start() for m in FILE_HEADER_RE.finditer(diff_text)] + [len(diff_text)]
+    for start, end in zip(starts, starts[1:]):
+        section = diff_text[start:end]
+        path = section.split("\n", 1)[0].rsplit(" b/", 1)[-1]
+        hunk_starts = [m.start() for m in HUNK_HEADER_RE.finditer(section)]
+        if not hunk_starts or "GIT binary patch" in section:
+            hunks.append((path, section))
+            continue
+        header = section[:hunk_starts[0]]
+        for h_start, h_end in zip(hunk_starts, hunk_starts[1:] + [len(section)]):
+            hunks.append((path, header + section[h_start:h_end]))
+    return hunks
+
+
+def commit_hunks(repo, commit_hexsha, exclude=(pinned_versions.CMAKELISTS_PATH,)):
+    """
+    Hunks of commit_hexsha against its first parent, leaving out the pin files the flattening rewrites anyway.
+    """
+    diff = repo.git.diff(f"{commit_hexsha}^", commit_hexsha, "--no-renames", "--binary", "--full-index",
+                         "--", ".", *(f":(exclude){path}" for path in exclude))
+    return split_hunks(diff + "\n" if diff else "")
+
+
+def describe_hunk(path, patch_text):
+    m = re.search(r"^(@@ [^@]* @@)", patch_text, re.M)
+    return f"{path} {m.group(1)}" if m else path
+
+
+class TreePatcher:
+    """
+    Applies patches to trees in the object database through a throwaway index. Results are memoized by
+    (tree, patches), and a patch list is applied on top of its memoized prefix, so probing a position
+    costs at most one `git apply` per hunk it hasn't seen yet. Safe to share between threads.
+    """
+    def __init__(self, repo):
+        self.repo = repo
+        self._applied = {}
+        self._lock = threading.RLock()
+
+    def apply(self, tree_hexsha, patches):
+        """
+        Tree with patches (a tuple of patch texts) applied in order, or None if one doesn't apply.
+        """
+        if not patches:
+            return tree_hexsha
+        key = (tree_hexsha, patches)
+        with self._lock:
+            if key not in self._applied:
+                prefix = self.apply(tree_hexsha, patches[:-1])
+                self._applied[key] = None if prefix is None else self._apply_one(prefix, patches[-1])
+            return self._applied[key]
+
+    def _apply_one(self, tree_hexsha, patch):
+        with tempfile.TemporaryDirectory(prefix="uplift-hunk-") as tmp:
+            index_path, patch_path = os.path.join(tmp, "index"), os.path.join(tmp, "hunk.patch")
+            with open(patch_path, "w") as f:
+                f.write(patch)
+            env = {"GIT_INDEX_FILE": index_path}
+            self.repo.git.read_tree(tree_hexsha, env=env)
+            try:
+                self.repo.git.apply("--cached", patch_path, env=env)
+            except git.exc.GitCommandError:
+                return None
+            return self.repo.git.write_tree(env=env)
+
+
+def first_true(lo, hi, predicate, pool=None, probes=1):
+    """
+    Smallest i in [lo, hi) with predicate(i), assuming predicate is monotonic (False...False True...True).
+    Returns hi if it is never true. With a pool, each round evaluates up to `probes` evenly spaced indices
+    concurrently, so the range shrinks (probes + 1)-fold per round instead of 2-fold.
+    """
+    while lo < hi:
+        n = hi - lo
+        points = list(range(lo, hi)) if n <= probes else [lo + j * n // (probes + 1) for j in range(1, probes + 1)]
+        results = list(pool.map(predicate, points)) if pool and len(points) > 1 else [predicate(i) for i in points]
+        hi = min([i for i, ok in zip(points, results) if ok] + [hi])
+        lo = max([i + 1 for i, ok in zip(points, results) if not ok and i < hi] + [lo])
+    return lo
+
+
+def place_hunks(patcher, base_tree, hunks, n_positions, accept=None, jobs=1):
+    """
+    Positions (0..n_positions-1) for hunks, each the earliest where the hunk applies cleanly on top of the
+    hunks placed before it and accept(position, hunk_index, tree_with_hunk) is true (accept can be None).
+    A hunk that fits nowhere goes to the last position, where the entry gets the uplift commit's own tree.
+    jobs > 1 checks that many positions of a hunk at once; accept must then be thread-safe.
+    """
+    positions = []
+    pool = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+
+    def tree_at(position, extra=None):
+        patches = tuple(h[1] for h, p in zip(hunks, positions) if p <= position)
+        if extra is not None:
+            patches += (extra,)
+        return patcher.apply(base_tree, patches)
+
+    for index, (_, patch) in enumerate(hunks):
+        def fits(position):
+            tree = tree_at(position, patch)
+            return tree is not None and (accept is None or accept(position, index, tree))
+
+        last = n_positions - 1
+        positions.append(first_true(0, last, fits, pool, jobs))
+    if pool:
+        pool.shutdown()
+    return positions
+
+
+def entry_trees(patcher, base_tree, final_tree, hunks, positions, n_positions):
+    """
+    The tree of every position given the hunk positions; the last one is final_tree (the uplift commit's).
+    A position whose hunks don't apply together falls back to final_tree.
+    """
+    trees = []
+    for position in range(n_positions - 1):
+        patches = tuple(h[1] for h, p in zip(hunks, positions) if p <= position)
+        trees.append(patcher.apply(base_tree, patches) or final_tree)
+    return trees + [final_tree]
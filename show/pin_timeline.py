@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+'''
+Usage:
+    ./show/pin_timeline.py                          # update the timeline, print where each repo is now
+    ./show/pin_timeline.py --at 2025-09-01          # which tt-mlir / tt-metal each repo was on at that date
+    ./show/pin_timeline.py --at "2025-09-01 12:00" --repo tt-xla --offline
+    ./show/pin_timeline.py --find-metal 1a2b3c4d        # first tt-mlir / FE commits that include a tt-metal commit
+
+Builds a timeline of (commit, date, pinned tt-mlir, pinned tt-metal) over the first-parent history of
+origin/main of each frontend (tt-xla, tt-forge-fe; add tt-torch with --repo) and of tt-mlir itself
+(its tt-metal pin), in a SQLite table: <cache dir>/pin_timeline.sqlite (see cache_paths.py).
+A frontend's tt-metal is the TT_METAL_VERSION of the tt-mlir commit it pins.
+
+Each run only reads the commits that landed since the last one: one `git rev-list` for the new commits
+and one path-limited `git log --raw` for the ones that move a pin, whose blobs are resolved through
+pinned_versions.py. If a branch was rewritten, that repo's timeline is rebuilt. A frontend commit pinning a
+tt-mlir commit that the local clone doesn't have is stored without a tt-metal, and resolved again on
+every update until the commit has been fetched.
+
+--find-metal is the reverse lookup. tt-metal's first-parent history is indexed too (positions only), and
+every pin is mapped to a position: the last commit of the pinned repo's timeline it contains. Walking a
+repo's pin change points (its uplift commits) with a running maximum of those positions gives sorted
+intervals: the uplift at change point i brings in the positions up to max_i. The first commit including
+a given tt-metal commit is then a binary search, first in tt-mlir, then in each FE for that tt-mlir commit.
+Pins missing from the local clones can't be placed; the change points before an answer that have one are
+reported with it.
+
+Example output:
+repo         | commit   | date                | tt-mlir  | tt-metal
+-------------------------------------------------------------------
+tt-xla       | 90c981f6 | 2025-09-01 11:46:06 | c659dddd | 8f2a4e1c
+tt-forge-fe  | 4e0d7b9a | 2025-08-31 20:25:39 | 17e1c32c | 5b8d2a33
+tt-mlir      | c659dddd | 2025-09-01 09:12:40 | -        | 8f2a4e1c
+'''
+import argparse
+import bisect
+import os
+import sqlite3
+import sys
+from datetime import date, datetime, time, timedelta
+
+import git
+
+import clone_strategy
+import pinned_versions
+import repo_session
+from cache_paths import get_cache_dir
+
+REPOS = {
+    "tt-torch": "https://github.com/tenstorrent/tt-torch.git",
+    "tt-xla": "https://github.com/tenstorrent/tt-xla.git",
+    "tt-forge-fe": "https://github.com/tenstorrent/tt-forge-fe.git",
+    "tt-mlir": "https://github.com/tenstorrent/tt-mlir.git",
+    "tt-metal": "https://github.com/tenstorrent/tt-metal.git",
+}
+FRONTENDS = ["tt-xla", "tt-forge-fe"]
+TIMELINE_REPOS = ["tt-torch", "tt-xla", "tt-forge-fe", "tt-mlir"]
+PIN_PATHS = [pinned_versions.CMAKELISTS_PATH, pinned_versions.MLIR_SUBMODULE_PATH]
+NULL_SHA = "0" * 40
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS timeline (
+    repo  TEXT NOT NULL,
+    seq   INTEGER NOT NULL,
+    sha   TEXT NOT NULL,
+    time  INTEGER NOT NULL,
+    mlir  TEXT,
+    metal TEXT,
+    PRIMARY KEY (repo, seq)
+);
+CREATE INDEX IF NOT EXISTS timeline_time ON timeline (repo, time);
+CREATE INDEX IF NOT EXISTS timeline_sha ON timeline (sha);
+CREATE TABLE IF NOT EXISTS landing (
+    repo TEXT NOT NULL,
+    sha  TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    seq  INTEGER,
+    upto INTEGER NOT NULL,
+    PRIMARY KEY (repo, sha, kind)
+);
+"""
+
+
+def default_db_path():
+    return os.path.join(get_cache_dir(), "pin_timeline.sqlite")
+
+
+def open_timeline(path=None):
+    """
+    Open (creating if needed) the timeline database.
+    """
+    conn = sqlite3.connect(path or default_db_path())
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def ensure_repo(repo_name):
+    """
+    Clone repo_name if it's missing, fetch it otherwise (at most once per run, never with --offline) and
+    return its handle. The working tree is never touched.
+    """
+    url = REPOS[repo_name]
+    if not os.path.exists(repo_name):
+        if repo_session.offline:
+            raise SystemExit(f"Error: {repo_name} is not cloned and --offline was given")
+        print(f"Cloning {repo_name}...")
+        repo_session.sync_once(repo_name, lambda: clone_strategy.clone(url, repo_name, repo_name))
+    else:
+        def fetch():
+            clone_strategy.prepare_fetch(repo_name, repo_name, url)
+            repo_session.get_repo(repo_name).remotes.origin.fetch()
+        repo_session.sync_once(repo_name, fetch)
+    return repo_session.get_repo(repo_name)
+
+
+def prefetch_pins(repo_name, rev_range):
+    """
+    In a blobless clone, fetch every third_party/CMakeLists.txt version of rev_range with one request
+    (see clone_strategy.py). Does nothing offline or in full clones.
+    """
+    if not repo_session.offline:
+        clone_strategy.prefetch_paths(repo_name, [rev_range], [pinned_versions.CMAKELISTS_PATH])
+
+
+def first_parent_commits(repo, rev_range):
+    """
+    [(sha, committer timestamp)] of the first-parent commits in rev_range, oldest first.
+    """
+    out = repo.git.rev_list("--first-parent", "--reverse", "--timestamp", rev_range)
+    return [(sha, int(ts)) for ts, sha in (line.split() for line in out.splitlines())]
+
+
+def pin_changes(repo, rev_range):
+    """
+    {sha: {path: (mode, hexsha) or None}} for the first-parent commits of rev_range that change a pin file,
+    from one path-limited `git log --raw` against each commit's first parent.
+    """
+    out = repo.git.log("-m", "--first-parent", "--full-history", "--raw", "--no-abbrev", "--format=commit %H",
+                       rev_range, "--", *PIN_PATHS)
+    changes, sha = {}, None
+    for line in out.splitlines():
+        if line.startswith("commit "):
+            sha = line.split()[1]
+        elif line.startswith(":"):
+            meta, path = line[1:].split("\t", 1)
+            _, new_mode, _, new_sha, _ = meta.split()
+            changes.setdefault(sha, {})[path] = None if new_sha == NULL_SHA else (int(new_mode, 8), new_sha)
+    return changes
+
+
+def metal_of_mlir(mlir_repo, mlir_sha):
+    """
+    TT_METAL_VERSION pinned by a tt-mlir commit, or None if it isn't in the local clone.
+    """
+    if not mlir_sha:
+        return None
+    try:
+        commit = mlir_repo.commit(mlir_sha)
+    except (ValueError, git.exc.BadName):
+        return None
+    return pinned_versions.commit_pins(commit).get("TT_METAL_VERSION")
+
+
+def resolve_pins(repo_name, repo, entries, mlir_repo):
+    """
+    (mlir, metal) pinned by a commit whose pin files have the tree entries {path: (mode, hexsha) or None}.
+    """
+    cmake = entries.get(pinned_versions.CMAKELISTS_PATH)
+    versions = pinned_versions.cmake_versions(repo, cmake[1]) if cmake and cmake[0] != pinned_versions.GITLINK_MODE else {}
+    if repo_name == "tt-mlir":
+        return None, versions.get("TT_METAL_VERSION")
+    gitlink = entries.get(pinned_versions.MLIR_SUBMODULE_PATH)
+    mlir = versions.get("TT_MLIR_VERSION")
+    if gitlink and gitlink[0] == pinned_versions.GITLINK_MODE:
+        mlir = gitlink[1]
+    return mlir, metal_of_mlir(mlir_repo, mlir)
+
+
+def update_repo(conn, repo_name, ref, mlir_repo):
+    """
+    Append the first-parent commits of ref that aren't in repo_name's timeline yet (rebuilding it if ref no
+    longer contains the stored tip). Returns the number of rows added.
+    """
+    repo = repo_session.get_repo(repo_name)
+    row = conn.execute("SELECT seq, sha FROM timeline WHERE repo = ? ORDER BY seq DESC LIMIT 1", (repo_name,)).fetchone()
+    if row and not repo.is_ancestor(row[1], ref):
+        print(f"{repo_name}: {row[1][:8]} is no longer on {ref}, rebuilding its timeline")
+        conn.execute("DELETE FROM timeline WHERE repo = ?", (repo_name,))
+        conn.execute("DELETE FROM landing WHERE repo = ?", (repo_name,))
+        row = None
+    rev_range = f"{row[1]}..{ref}" if row else ref
+    seq = row[0] + 1 if row else 0
+    entries = {path: pinned_versions.get_tree_entry(repo.commit(row[1]), path) for path in PIN_PATHS} if row else {}
+
+    commits = first_parent_commits(repo, rev_range)
+    if not commits:
+        return 0
+    if repo_name == "tt-metal":
+        changes = {}  # positions only
+    else:
+        prefetch_pins(repo_name, rev_range)
+        changes = pin_changes(repo, rev_range)
+    pins = resolve_pins(repo_name, repo, entries, mlir_repo)
+    rows = []
+    for sha, ts in commits:
+        if sha in changes:
+            entries.update(changes[sha])
+            pins = resolve_pins(repo_name, repo, entries, mlir_repo)
+        rows.append((repo_name, seq, sha, ts, *pins))
+        seq += 1
+    conn.executemany("INSERT INTO timeline (repo, seq, sha, time, mlir, metal) VALUES (?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    return len(rows)
+
+
+def resolve_missing_metal(conn, repo_name, mlir_repo):
+    """
+    Fill in the tt-metal of repo_name's rows whose pinned tt-mlir commit wasn't in the local clone when they
+    were stored, now that it may have been fetched. Returns the number of rows still unresolved.
+    """
+    rows = conn.execute("SELECT DISTINCT mlir FROM timeline WHERE repo = ? AND mlir IS NOT NULL AND metal IS NULL",
+                        (repo_name,)).fetchall()
+    for (mlir,) in rows:
+        metal = metal_of_mlir(mlir_repo, mlir)
+        if metal:
+            conn.execute("UPDATE timeline SET metal = ? WHERE repo = ? AND mlir = ? AND metal IS NULL",
+                         (metal, repo_name, mlir))
+    conn.commit()
+    return conn.execute("SELECT COUNT(*) FROM timeline WHERE repo = ? AND mlir IS NOT NULL AND metal IS NULL",
+                        (repo_name,)).fetchone()[0]
+
+
+def update_timeline(conn, repo_names, ref="origin/main"):
+    """
+    Sync every repo once (tt-mlir first: the frontends' tt-metal comes from it) and extend its timeline.
+    """
+    mlir_repo = ensure_repo("tt-mlir")
+    for repo_name in sorted(repo_names, key=lambda name: name != "tt-mlir"):
+        repo = mlir_repo if repo_name == "tt-mlir" else ensure_repo(repo_name)
+        added = update_repo(conn, repo_name, ref, mlir_repo)
+        total = conn.execute("SELECT COUNT(*) FROM timeline WHERE repo = ?", (repo_name,)).fetchone()[0]
+        print(f"  {repo_name:<12} +{added} commit(s), {total} in timeline (tip {repo.commit(ref).hexsha[:8]})")
+        if repo_name not in ("tt-mlir", "tt-metal"):
+            unresolved = resolve_missing_metal(conn, repo_name, mlir_repo)
+            if unresolved:
+                print(f"  {repo_name:<12} {unresolved} commit(s) pin a tt-mlir commit missing from the local clone, tt-metal unknown")
+    pinned_versions.flush_cache()
+
+
+def pins_at(conn, repo_name, when=None):
+    """
+    (sha, time, mlir, metal) of the last first-parent commit of repo_name committed at or before `when`
+    (a unix timestamp; None for the latest), or None.
+    """
+    if when is None:
+        return conn.execute("SELECT sha, time, mlir, metal FROM timeline WHERE repo = ? ORDER BY seq DESC LIMIT 1",
+                            (repo_name,)).fetchone()
+    return conn.execute("SELECT sha, time, mlir, metal FROM timeline WHERE repo = ? AND time <= ? "
+                        "ORDER BY seq DESC LIMIT 1", (repo_name, when)).fetchone()
+
+
+def timeline_sha(conn, repo_name, seq):
+    return conn.execute("SELECT sha FROM timeline WHERE repo = ? AND seq = ?", (repo_name, seq)).fetchone()[0]
+
+
+def landing_seq(conn, repo_name, sha, kind):
+    """
+    Position of any commit on repo_name's timeline: for kind "last", the seq of the last timeline commit
+    that sha contains; for "first", of the first one containing sha. None if there is none (yet).
+    A commit on the branch is its own seq. Others are binary searched with `git merge-base --is-ancestor`
+    (containment is monotonic along first parents) and cached; a cached answer is only re-checked against
+    the commits appended since.
+    """
+    row = conn.execute("SELECT seq FROM timeline WHERE repo = ? AND sha = ?", (repo_name, sha)).fetchone()
+    if row:
+        return row[0]
+    repo = repo_session.get_repo(repo_name)
+    try:
+        sha = repo.commit(sha).hexsha
+    except (ValueError, git.exc.BadName):
+        return None
+    n = conn.execute("SELECT COUNT(*) FROM timeline WHERE repo = ?", (repo_name,)).fetchone()[0]
+    cached = conn.execute("SELECT seq, upto FROM landing WHERE repo = ? AND sha = ? AND kind = ?",
+                          (repo_name, sha, kind)).fetchone()
+    seq, lo = cached if cached else (None, 0)
+    if kind == "last":
+        # contained: True...True False...False
+        first_not = lo + bisect.bisect_left(range(lo, n), True,
+                                            key=lambda i: not repo.is_ancestor(timeline_sha(conn, repo_name, i), sha))
+        if first_not > lo:
+            seq = first_not - 1
+    elif seq is None:
+        first = lo + bisect.bisect_left(range(lo, n), True, key=lambda i: repo.is_ancestor(sha, timeline_sha(conn, repo_name, i)))
+        seq = first if first < n else None
+    conn.execute("INSERT OR REPLACE INTO landing (repo, sha, kind, seq, upto) VALUES (?, ?, ?, ?, ?)",
+                 (repo_name, sha, kind, seq, n))
+    conn.commit()
+    return seq
+
+
+def has_commit(repo_name, sha):
+    try:
+        repo_session.get_repo(repo_name).commit(sha)
+    except (ValueError, git.exc.BadName):
+        return False
+    return True
+
+
+def first_including(conn, repo_name, pin_column, pin_repo, target_seq):
+    """
+    First commit of repo_name's timeline whose pin (pin_column "mlir" or "metal", a pin_repo commit)
+    contains the commit at target_seq of pin_repo's timeline.
+    Returns ((sha, time, mlir, metal) or None, [(sha, pin)]): the second item lists the change points up to
+    the answer whose pin isn't in the local pin_repo clone. They can't be placed, so the real first commit
+    may be one of them.
+    """
+    points, positions, unresolved, best, prev_pin = [], [], [], -1, None
+    rows = conn.execute(f"SELECT seq, sha, time, mlir, metal, {pin_column} FROM timeline WHERE repo = ? ORDER BY seq",
+                        (repo_name,))
+    for seq, sha, ts, mlir, metal, pin in rows:
+        if pin != prev_pin:
+            position = landing_seq(conn, pin_repo, pin, "last") if pin else None
+            if position is None and pin and not has_commit(pin_repo, pin):
+                unresolved.append((len(points), sha, pin))
+            best = max(best, -1 if position is None else position)
+            points.append((sha, ts, mlir, metal))
+            positions.append(best)
+            prev_pin = pin
+    i = bisect.bisect_left(positions, target_seq)
+    return points[i] if i < len(points) else None, [(sha, pin) for point, sha, pin in unresolved if point <= i]
+
+
+def find_metal(conn, metal_sha, repo_names):
+    """
+    Print the tt-metal commit and the first tt-mlir / FE commits whose pins include it.
+    """
+    metal_repo = repo_session.get_repo("tt-metal")
+    try:
+        commit = metal_repo.commit(metal_sha)
+    except (ValueError, git.exc.BadName):
+        raise SystemExit(f"Error: {metal_sha} is not a commit of the local tt-metal clone")
+    metal_seq = landing_seq(conn, "tt-metal", commit.hexsha, "first")
+    print(f"tt-metal {commit.hexsha[:8]} | {commit.committed_datetime:%Y-%m-%d %H:%M:%S} | {commit.summary[:80]}")
+    if metal_seq is None:
+        print("Not on tt-metal's tracked branch yet")
+        return
+    first, unresolved = {}, {}
+    first["tt-mlir"], unresolved["tt-mlir"] = first_including(conn, "tt-mlir", "metal", "tt-metal", metal_seq)
+    mlir_seq = landing_seq(conn, "tt-mlir", first["tt-mlir"][0], "first") if first["tt-mlir"] else None
+    for repo_name in repo_names:
+        if repo_name != "tt-mlir" and mlir_seq is not None:
+            first[repo_name], unresolved[repo_name] = first_including(conn, repo_name, "mlir", "tt-mlir", mlir_seq)
+    print("\nFirst commits including it:")
+    print_rows([(repo_name, first.get(repo_name)) for repo_name in ["tt-mlir"] + [r for r in repo_names if r != "tt-mlir"]],
+               missing="(not yet)")
+    missing = [(repo_name, sha, pin) for repo_name, points in unresolved.items() for sha, pin in points]
+    if missing:
+        print(f"\nWarning: {len(missing)} pin(s) along the way aren't in the local clones, so an earlier commit "
+              f"may already include it (fetch them and rerun):")
+        for repo_name, sha, pin in missing:
+            pin_repo = "tt-metal" if repo_name == "tt-mlir" else "tt-mlir"
+            print(f"  {repo_name:<12} {sha[:8]} pins {pin_repo} {pin[:8]}")
+
+
+def parse_when(text):
+    """
+    Unix timestamp of an ISO date / datetime (local time unless it has an offset).
+    A date alone means the end of that day, so commits made on it count.
+    """
+    try:
+        if len(text.strip()) == len("2025-09-01"):
+            day = datetime.combine(date.fromisoformat(text.strip()), time.min)
+            return int((day + timedelta(days=1)).timestamp()) - 1
+        return int(datetime.fromisoformat(text).timestamp())
+    except ValueError:
+        raise SystemExit(f"Error: can't parse date '{text}' (expected e.g. 2025-09-01 or '2025-09-01 12:00')")
+
+
+def print_table(conn, repo_names, when=None):
+    print_rows([(repo_name, pins_at(conn, repo_name, when)) for repo_name in repo_names])
+
+
+def print_rows(rows, missing="(no commit yet)"):
+    """
+    Print [(repo_name, (sha, time, mlir, metal) or None)] as a table.
+    """
+    short = lambda sha: sha[:8] if sha else "-"
+    print(f"{'repo':<12} | {'commit':<8} | {'date':<19} | {'tt-mlir':<8} | tt-metal")
+    print("-" * 67)
+    for repo_name, row in rows:
+        if row is None:
+            print(f"{repo_name:<12} | {'-':<8} | {missing:<19} | {'-':<8} | -")
+            continue
+        sha, ts, mlir, metal = row
+        date = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{repo_name:<12} | {short(sha):<8} | {date:<19} | {short(mlir):<8} | {short(metal)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FE -> tt-mlir -> tt-metal pin timeline.")
+    parser.add_argument("--at", metavar="DATE", help="Show what each repo pinned at this date (ISO, e.g. 2025-09-01 or '2025-09-01 12:00'; a date alone means the end of that day)")
+    parser.add_argument("--repo", action="append", choices=TIMELINE_REPOS,
+                        help=f"Repo(s) to include (default: {', '.join(FRONTENDS)} and tt-mlir)")
+    parser.add_argument("--find-metal", metavar="SHA", help="Show the first tt-mlir and FE commits that include this tt-metal commit")
+    parser.add_argument("--ref", default="origin/main", help="Branch whose first-parent history is tracked (default: origin/main)")
+    parser.add_argument("--db", help="Path of the timeline database (default: <cache dir>/pin_timeline.sqlite)")
+    parser.add_argument("--offline", action="store_true", help="Don't clone or fetch; extend the timeline from the local clones as-is")
+    parser.add_argument("--no-update", action="store_true", help="Only query the stored timeline")
+    args = parser.parse_args()
+
+    repo_names = args.repo or FRONTENDS + ["tt-mlir"]
+    if args.offline:
+        repo_session.set_offline()
+    conn = open_timeline(args.db)
+    # the reverse lookup needs tt-metal positions and the tt-mlir timeline
+    tracked = repo_names + [r for r in ["tt-mlir", "tt-metal"] if r not in repo_names] if args.find_metal else repo_names
+    if not args.no_update:
+        pinned_versions.open_cache()
+        print("Updating pin timeline...")
+        update_timeline(conn, tracked, args.ref)
+        print()
+    if args.find_metal:
+        find_metal(conn, args.find_metal, repo_names)
+    else:
+        print_table(conn, repo_names, parse_when(args.at) if args.at else None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+Path-restricted extraction of pinned dependency versions.
+
+FE repos pin tt-mlir either via TT_MLIR_VERSION in third_party/CMakeLists.txt (tt-xla, tt-torch)
+or via the third_party/tt-mlir submodule (tt-forge-fe). tt-mlir pins tt-metal via TT_METAL_VERSION
+in third_party/CMakeLists.txt.
+
+Instead of computing a full patch diff of a commit and discarding everything but one file, we look
+up that single path in the commit's tree and in its parent's tree. If the tree entries are identical
+the commit can't have changed the pin and nothing is read at all; otherwise only the two small blobs
+(or the two gitlink hashes) are read.
+
+Blobs are content-addressed, so the versions parsed from a CMakeLists.txt blob never go stale: they are
+memoized in memory by blob SHA (consecutive uplift commits share a blob: one's new pin file is the next
+one's old), and, once open_cache() was called, persisted in SQLite so later runs don't read the blob
+(or lazily fetch it in a blobless clone) again. commit_pins() answers every pin of a commit, memoized
+by commit SHA. Default cache location: <cache dir>/pinned_versions.sqlite (see cache_paths.py).
+"""
+import functools
+import json
+import os
+import re
+import sqlite3
+import threading
+
+import git
+
+from cache_paths import get_cache_dir
+
+CMAKELISTS_PATH = "third_party/CMakeLists.txt"
+MLIR_SUBMODULE_PATH = "third_party/tt-mlir"
+
+GITLINK_MODE = 0o160000
+
+CMAKE_VERSION_RE = re.compile(r'^[ \t]*set\((\w+_VERSION)\s+"([^"]*)"\)', re.MULTILINE)
+
+# In-memory memo sizes; a version set is a handful of short strings
+BLOB_CACHE_SIZE = 65536
+COMMIT_CACHE_SIZE = 65536
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cmake_versions (
+    blob     TEXT PRIMARY KEY,
+    versions TEXT NOT NULL
+);
+"""
+
+_cache = None  # persistent version cache connection (see open_cache), None when disabled
+# The cache is shared by uplift_history.py's worker threads; serialize access to it
+_cache_lock = threading.Lock()
+
+
+def default_cache_path():
+    return os.path.join(get_cache_dir(), "pinned_versions.sqlite")
+
+
+def open_cache(path=None):
+    """
+    Persist the versions parsed from CMakeLists.txt blobs in path (created if needed) from now on.
+    Call flush_cache() once a batch of lookups is done.
+    """
+    global _cache
+    _cache = sqlite3.connect(path or default_cache_path(), check_same_thread=False)
+    _cache.executescript(SCHEMA)
+
+
+def flush_cache():
+    if _cache is not None:
+        with _cache_lock:
+            _cache.commit()
+
+
+def get_tree_entry(commit, path):
+    """
+    Look up a single path in a commit's tree.
+    Returns (mode, hexsha) or None if the path doesn't exist.
+    """
+    try:
+        obj = commit.tree / path
+    except KeyError:
+        return None
+    return (obj.mode, obj.hexsha)
+
+
+def parse_cmake_version(text, var_name):
+    """
+    Return the value of set(<var_name> "<value>") in a CMakeLists.txt, or None.
+    """
+    m = re.search(rf'^[ \t]*set\({var_name}\s+"([^"]*)"\)', text, re.MULTILINE)
+    return m.group(1) if m else None
+
+
+def parse_cmake_versions(text):
+    """
+    Every set(<NAME>_VERSION "<value>") in a CMakeLists.txt: {var_name: value} (first one wins, like
+    parse_cmake_version).
+    """
+    versions = {}
+    for m in CMAKE_VERSION_RE.finditer(text):
+        versions.setdefault(m.group(1), m.group(2))
+    return versions
+
+
+@functools.lru_cache(maxsize=BLOB_CACHE_SIZE)
+def cmake_versions(repo, blob_hexsha):
+    """
+    parse_cmake_versions of a blob, read at most once per blob SHA (across runs with open_cache).
+    The returned dict is shared; don't modify it.
+    """
+    if _cache is not None:
+        with _cache_lock:
+            row = _cache.execute("SELECT versions FROM cmake_versions WHERE blob = ?", (blob_hexsha,)).fetchone()
+        if row:
+            return json.loads(row[0])
+    data = repo.odb.stream(bytes.fromhex(blob_hexsha)).read()
+    versions = parse_cmake_versions(data.decode(errors="replace"))
+    if _cache is not None:
+        with _cache_lock:
+            _cache.execute("INSERT OR REPLACE INTO cmake_versions (blob, versions) VALUES (?, ?)",
+                           (blob_hexsha, json.dumps(versions)))
+    return versions
+
+
+def set_cmake_version(text, var_name, value):
+    """
+    Return CMakeLists.txt text with every set(<var_name> "...") pointing at value, keeping indentation.
+    """
+    pattern = re.compile(rf'^([ \t]*)set\({var_name}\s+"[^"]*"\)', re.MULTILINE)
+    return pattern.sub(lambda m: f'{m.group(1)}set({var_name} "{value}")', text)
+
+
+def set_cmake_versions(text, pins):
+    """
+    set_cmake_version for every {var_name: value} in pins.
+    """
+    for var_name, value in pins.items():
+        text = set_cmake_version(text, var_name, value)
+    return text
+
+
+def get_pinned_version(commit, path, var_name=None):
+    """
+    Return the version pinned at a commit: the gitlink hash for a submodule path,
+    or the value of var_name in the CMakeLists.txt at path.
+    """
+    entry = get_tree_entry(commit, path)
+    return read_pinned_version(commit.repo, entry, var_name)
+
+
+def read_pinned_version(repo, entry, var_name=None):
+    """
+    Resolve a (mode, hexsha) tree entry to a pinned version.
+    """
+    if entry is None:
+        return None
+    mode, hexsha = entry
+    if mode == GITLINK_MODE:
+        return hexsha
+    if var_name is None:
+        return None
+    return cmake_versions(repo, hexsha).get(var_name)
+
+
+@functools.lru_cache(maxsize=COMMIT_CACHE_SIZE)
+def commit_pins(commit):
+    """
+    Every version a commit pins: the *_VERSION values of third_party/CMakeLists.txt (TT_MLIR_VERSION in
+    tt-xla / tt-torch, TT_METAL_VERSION in tt-mlir) plus {MLIR_SUBMODULE_PATH: hash} where tt-mlir is a
+    submodule (tt-forge-fe). The returned dict is shared; don't modify it.
+    """
+    pins = {}
+    entry = get_tree_entry(commit, CMAKELISTS_PATH)
+    if entry and entry[0] != GITLINK_MODE:
+        pins.update(cmake_versions(commit.repo, entry[1]))
+    entry = get_tree_entry(commit, MLIR_SUBMODULE_PATH)
+    if entry and entry[0] == GITLINK_MODE:
+        pins[MLIR_SUBMODULE_PATH] = entry[1]
+    return pins
+
+
+@functools.lru_cache(maxsize=None)
+def _open_repo(repo_dir):
+    return git.Repo(repo_dir)
+
+
+def pins_at(repo_dir, rev="HEAD"):
+    """
+    commit_pins of rev in the clone at repo_dir.
+    """
+    return commit_pins(_open_repo(repo_dir).commit(rev))
+
+
+def get_version_change(commit, path, var_name=None):
+    """
+    Compare the version pinned by a commit with the one pinned by its first parent.
+    Returns (new_hash, old_hash), or (None, None) if the commit doesn't change the pin.
+    """
+    parent = commit.parents[0] if commit.parents else None
+    new_entry = get_tree_entry(commit, path)
+    old_entry = get_tree_entry(parent, path) if parent else None
+    if new_entry == old_entry:
+        return (None, None)
+    new_hash = read_pinned_version(commit.repo, new_entry, var_name)
+    old_hash = read_pinned_version(commit.repo, old_entry, var_name)
+    if new_hash == old_hash:
+        return (None, None)
+    return (new_hash, old_hash)
@@ -0,0 +1,59 @@
+"""
+Per-process repository session.
+
+A single uplift_history.py run queries tt-mlir and tt-metal ranges dozens of times. The session makes
+sure each repository hits the network at most once per process (never, in offline mode), and caches
+opened git.Repo handles so repeated range queries don't re-open the repo or touch its working tree.
+
+Handles are cached per thread: a git.Repo keeps persistent `git cat-file` processes that must not be
+shared between threads.
+"""
+import threading
+
+import git
+
+offline = False
+
+_synced = set()
+_sync_locks = {}
+_sync_locks_guard = threading.Lock()
+_handles = threading.local()
+
+
+def set_offline(value=True):
+    """
+    In offline mode sync_once() never runs its sync function; only existing local clones are used.
+    """
+    global offline
+    offline = value
+
+
+def get_repo(repo_path):
+    """
+    Return a cached git.Repo handle for repo_path, opened at most once per thread.
+    """
+    repos = _handles.__dict__.setdefault("repos", {})
+    if repo_path not in repos:
+        repos[repo_path] = git.Repo(repo_path)
+    return repos[repo_path]
+
+
+def is_synced(repo_path):
+    return repo_path in _synced
+
+
+def sync_once(repo_path, sync_fn):
+    """
+    Run sync_fn() (clone / fetch / pull) for repo_path unless it already ran in this process.
+    Returns True if sync_fn ran. Safe to call from several threads.
+    """
+    if offline:
+        return False
+    with _sync_locks_guard:
+        lock = _sync_locks.setdefault(repo_path, threading.Lock())
+    with lock:
+        if repo_path in _synced:
+            return False
+        sync_fn()
+        _synced.add(repo_path)
+    return True
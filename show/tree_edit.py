@@ -0,0 +1,107 @@
+"""
+Build commits directly in a repository's object database.
+
+Used to synthesize flattened uplift branches without a working tree: read the original commit's tree,
+swap a single blob (third_party/CMakeLists.txt) or gitlink (third_party/tt-mlir), write the new trees
+bottom-up and a commit object on top. Only the trees along the modified path are rewritten; every other
+subtree is reused by hash. Objects are read through GitPython's persistent cat-file process and written
+as loose objects in-process, so apart from patch application no git process is spawned per commit.
+"""
+import os
+import tempfile
+from io import BytesIO
+from stat import S_ISDIR
+
+from git.objects.fun import tree_entries_from_data, tree_to_stream
+from gitdb.base import IStream
+from gitdb.db.loose import LooseObjectDB
+
+BLOB_MODE = 0o100644
+TREE_MODE = 0o040000
+
+
+def read_object(repo, hexsha):
+    return repo.odb.stream(bytes.fromhex(hexsha)).read()
+
+
+def write_object(repo, obj_type, data):
+    """
+    Store a raw object as a loose object and return its hexsha.
+    Written in-process: repo.odb.store() would spawn `git hash-object` for every object.
+    """
+    loose_db = LooseObjectDB(os.path.join(repo.common_dir, "objects"))
+    istream = loose_db.store(IStream(obj_type, len(data), BytesIO(data)))
+    return istream.hexsha.decode()
+
+
+def write_blob(repo, data):
+    return write_object(repo, b"blob", data)
+
+
+def _tree_sort_key(entry):
+    # git sorts tree entries by name, comparing directories as if their name ended with '/'
+    binsha, mode, name = entry
+    return name + "/" if S_ISDIR(mode) else name
+
+
+def replace_entry(repo, tree_hexsha, path, mode, hexsha):
+    """
+    Return the hexsha of a tree equal to tree_hexsha except that path points at (mode, hexsha).
+    Intermediate trees are created if missing.
+    """
+    head, _, rest = path.partition("/")
+    entries = tree_entries_from_data(read_object(repo, tree_hexsha)) if tree_hexsha else []
+    existing = next((e for e in entries if e[2] == head), None)
+    if rest:
+        subtree = existing[0].hex() if existing and S_ISDIR(existing[1]) else None
+        new_entry = (bytes.fromhex(replace_entry(repo, subtree, rest, mode, hexsha)), TREE_MODE, head)
+    else:
+        new_entry = (bytes.fromhex(hexsha), mode, head)
+    if existing == new_entry:
+        return tree_hexsha
+    entries = [e for e in entries if e[2] != head] + [new_entry]
+    entries.sort(key=_tree_sort_key)
+    stream = BytesIO()
+    tree_to_stream(entries, stream.write)
+    return write_object(repo, b"tree", stream.getvalue())
+
+
+def format_signature(actor, when):
+    """
+    "Name <email> <epoch> <+hhmm>" as used in commit headers; when is a timezone-aware datetime.
+    """
+    offset = int(when.utcoffset().total_seconds()) // 60
+    sign = "+" if offset >= 0 else "-"
+    return f"{actor.name} <{actor.email}> {int(when.timestamp())} {sign}{abs(offset) // 60:02d}{abs(offset) % 60:02d}"
+
+
+def write_commit(repo, tree_hexsha, parent_hexshas, message, author, committer, author_date, commit_date):
+    """
+    Create a commit object (without moving any ref) and return its hexsha.
+    Produces the same object as repo.index.commit() given the same tree, parents, actors and dates.
+    """
+    lines = [f"tree {tree_hexsha}"]
+    lines += [f"parent {p}" for p in parent_hexshas]
+    lines.append(f"author {format_signature(author, author_date)}")
+    lines.append(f"committer {format_signature(committer, commit_date)}")
+    data = ("\n".join(lines) + "\n\n" + message).encode()
+    return write_object(repo, b"commit", data)
+
+
+def apply_patch_to_tree(repo, tree_hexsha, patch_path):
+    """
+    Apply a patch to a tree using a throwaway index (git apply --cached), never touching the
+    working tree or the repo's own index. Returns the new tree hexsha; raises GitCommandError
+    if the patch doesn't apply.
+    """
+    fd, index_path = tempfile.mkstemp(prefix="uplift-index-")
+    os.close(fd)
+    os.unlink(index_path)
+    env = {"GIT_INDEX_FILE": index_path}
+    try:
+        repo.git.read_tree(tree_hexsha, env=env)
+        repo.git.apply("--cached", patch_path, env=env)
+        return repo.git.write_tree(env=env)
+    finally:
+        if os.path.exists(index_path):
+            os.unlink(index_path)
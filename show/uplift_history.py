@@ -5,7 +5,22 @@ import argparse
 import subprocess
 import requests
 import re
-from pprint import pprint
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import clone_strategy
+import fast_import
+from flattened_header import flattened_commit_message, parse_flattened_header
+import git_log
+import github_client
+import patch_oracle
+import patch_placement
+import pinned_versions
+import repo_session
+import tree_edit
+import uplift_index
+
 REPOS = {
     "tt-torch": "https://github.com/tenstorrent/tt-torch.git",
     "tt-xla": "https://github.com/tenstorrent/tt-xla.git",
@@ -29,56 +44,29 @@ REPOS_SSH = {
 mlir2fe_uplift_commits = {} # map of frontend commits uplifting tt-mlir to their actual tt-mlir uplift commits
 metal2mlir_uplift_commits = {}
 
+edge_index = None # persistent uplift index connection (see uplift_index.py), None when disabled
+
 def get_mlir_change_from_mlir_uplift_commit(commit, fe_repo_name):
     """
-    Extract the before/after tt-mlir commit hashes from a frontend uplift commit.
-    For tt-torch/tt-xla: parse third_party/CMakeLists.txt diff.
-    For tt-forge-fe: parse submodule change in third_party/tt-mlir.
-    Returns (before_hash, after_hash)
+    Extract the new/old tt-mlir commit hashes from a frontend uplift commit.
+    For tt-torch/tt-xla: read TT_MLIR_VERSION from third_party/CMakeLists.txt.
+    For tt-forge-fe: read the third_party/tt-mlir submodule gitlink.
+    Only that one path is looked up in the commit and parent trees (see pinned_versions.py).
+    Returns (new_hash, old_hash)
     """
-    diff = commit.diff(commit.parents[0] if commit.parents else None, create_patch=True)
-    before_hash = None
-    after_hash = None
     if fe_repo_name in ["tt-torch", "tt-xla"]:
-        # Look for CMakeLists.txt diff
-        for d in diff:
-            if d.a_path and "third_party/CMakeLists.txt" in d.a_path:
-                for line in d.diff.decode().splitlines():
-                    if line.startswith("-set(TT_MLIR_VERSION ") or line.startswith("-    set(TT_MLIR_VERSION "):
-                        before_hash = line.split('"')[1]
-                    if line.startswith("+set(TT_MLIR_VERSION ") or line.startswith("+    set(TT_MLIR_VERSION "):
-                        after_hash = line.split('"')[1]
+        return pinned_versions.get_version_change(commit, pinned_versions.CMAKELISTS_PATH, "TT_MLIR_VERSION")
     elif fe_repo_name == "tt-forge-fe":
-        # Look for submodule change in third_party/tt-mlir
-        for d in diff:
-            if d.a_path and "third_party/tt-mlir" in d.a_path and d.new_file is False and d.deleted_file is False:
-                # Submodule diff: lines like -Subproject commit <hash> and +Subproject commit <hash>
-                for line in d.diff.decode().splitlines():
-                    if line.startswith("-Subproject commit "):
-                        before_hash = line.split()[-1]
-                    if line.startswith("+Subproject commit "):
-                        after_hash = line.split()[-1]
-    return (before_hash, after_hash)
+        return pinned_versions.get_version_change(commit, pinned_versions.MLIR_SUBMODULE_PATH)
+    return (None, None)
 
 def get_metal_change_from_metal_uplift_commit(commit):
     """
-    Extract the before/after tt-metal commit hashes from a tt-metal uplift commit into tt-mlir.
-    Handles both CMakeLists.txt (TT_METAL_VERSION) and submodule diffs (third_party/tt-metal).
-    Returns (before_hash, after_hash)
-    """
-    diff = commit.diff(commit.parents[0] if commit.parents else None, create_patch=True)
-    before_hash = None
-    after_hash = None
-    for d in diff:
-        if d.a_path and "third_party/CMakeLists.txt" in d.a_path:
-            # print("identified metal uplift commit from CMakeLists.txt diff", commit.message)
-            # print(d.diff.decode())
-            for line in d.diff.decode().splitlines():
-                if line.startswith("-set(TT_METAL_VERSION "):
-                    before_hash = line.split('"')[1]
-                if line.startswith("+set(TT_METAL_VERSION "):
-                    after_hash = line.split('"')[1]
-    return (before_hash, after_hash)
+    Extract the new/old tt-metal commit hashes from a tt-metal uplift commit into tt-mlir,
+    by reading TT_METAL_VERSION from third_party/CMakeLists.txt in the commit and parent trees.
+    Returns (new_hash, old_hash)
+    """
+    return pinned_versions.get_version_change(commit, pinned_versions.CMAKELISTS_PATH, "TT_METAL_VERSION")
     
 
 def get_pr_files_and_changes(pr_url):
@@ -93,20 +81,16 @@ def get_pr_files_and_changes(pr_url):
     owner, repo, pr_number = m.groups()
     
     # Get PR info
-    api_url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}"
-    resp = requests.get(api_url)
-    if resp.status_code != 200:
-        raise ValueError(f"Failed to fetch PR {pr_number}: {resp.status_code}")
-    
-    pr_info = resp.json()
+    try:
+        pr_info = github_client.get_json(f"repos/{owner}/{repo}/pulls/{pr_number}")
+    except requests.HTTPError as e:
+        raise ValueError(f"Failed to fetch PR {pr_number}: {e.response.status_code}")
     
-    # Get files changed in the PR
-    files_url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}/files"
-    files_resp = requests.get(files_url)
-    if files_resp.status_code != 200:
-        raise ValueError(f"Failed to fetch PR files: {files_resp.status_code}")
-    
-    files_changed = files_resp.json()
+    # Get files changed in the PR (paginated, up to 3000 files)
+    try:
+        files_changed = github_client.get_paginated(f"repos/{owner}/{repo}/pulls/{pr_number}/files")
+    except requests.HTTPError as e:
+        raise ValueError(f"Failed to fetch PR files: {e.response.status_code}")
     return pr_info, files_changed
 
 def extract_metal_version_changes_from_pr(pr_url):
@@ -215,8 +199,7 @@ def create_simulated_uplift_branch(fe_repo_name, pr_url, base_branch="main", new
     fe_cmakelists_path = os.path.join(fe_repo_name, 'third_party', 'CMakeLists.txt')
     
     # Get all commits from the new tt-mlir branch (in chronological order)
-    mlir_branch_commits = list(mlir_repo.iter_commits(mlir_branch_name))
-    mlir_branch_commits.reverse()  # Convert to chronological order
+    mlir_branch_commits = list(git_log.iter_commits(mlir_repo, mlir_branch_name, "--reverse"))  # chronological order
     
     # Create individual tt-xla commits for each tt-mlir commit
     for i, (metal_commit, mlir_commit) in enumerate(zip(reversed(metal_commits), mlir_branch_commits)):
@@ -260,7 +243,7 @@ def print_simulated_mlir_table(mlir_repo_path, branch_name, pr_url):
     Print a table showing the simulated tt-mlir uplift commits.
     """
     repo = git.Repo(mlir_repo_path)
-    commits = list(repo.iter_commits(branch_name))
+    commits = git_log.iter_commits(repo, branch_name)
     
     YELLOW = '\033[1;33m'
     RESET = '\033[0m'
@@ -269,7 +252,9 @@ def print_simulated_mlir_table(mlir_repo_path, branch_name, pr_url):
     print(f"{'MLIR_COMMIT':10} | {'METAL_COMMIT':12} | {'DATE':12} | MESSAGE")
     print("-" * 100)
     
+    total = 0
     for commit in commits:
+        total += 1
         # Extract metal commit hash from commit message
         metal_hash = "unknown"
         lines = commit.message.splitlines()
@@ -283,15 +268,14 @@ def print_simulated_mlir_table(mlir_repo_path, branch_name, pr_url):
         
         print(f"{commit.hexsha[:8]:10} | {metal_hash:12} | {date:12} | {msg}")
     
-    print(f"\nTotal: {len(commits)} tt-mlir commits with individual metal uplifts")
+    print(f"\nTotal: {total} tt-mlir commits with individual metal uplifts")
 
 def print_simulated_fe_table(fe_repo_path, branch_name, pr_url, mlir_commits):
     """
     Print a table showing the simulated FE uplift commits.
     """
     repo = git.Repo(fe_repo_path)
-    fe_commits = list(repo.iter_commits(branch_name))
-    fe_commits.reverse()  # Convert to chronological order
+    fe_commits = git_log.iter_commits(repo, branch_name, "--reverse")  # chronological order
     
     GREEN = '\033[1;32m'
     RESET = '\033[0m'
@@ -300,7 +284,9 @@ def print_simulated_fe_table(fe_repo_path, branch_name, pr_url, mlir_commits):
     print(f"{'FE_COMMIT':10} | {'MLIR_COMMIT':12} | {'METAL_COMMIT':12} | {'DATE':12} | MESSAGE")
     print("-" * 110)
     
+    total = 0
     for i, fe_commit in enumerate(fe_commits):
+        total += 1
         # Extract mlir and metal commit info from commit message
         mlir_hash = "unknown"
         metal_hash = "unknown"
@@ -322,7 +308,7 @@ def print_simulated_fe_table(fe_repo_path, branch_name, pr_url, mlir_commits):
         
         print(f"{fe_commit.hexsha[:8]:10} | {mlir_hash:12} | {metal_hash:12} | {date:12} | {msg}")
     
-    print(f"\nTotal: {len(fe_commits)} tt-xla commits with individual mlir uplifts")
+    print(f"\nTotal: {total} tt-xla commits with individual mlir uplifts")
 
 def is_mlir_uplift_commit(commit):
     """
@@ -331,28 +317,51 @@ def is_mlir_uplift_commit(commit):
     is_mlir_uplift_commit = "Uplift third_party/tt-mlir" in commit.message
     return is_mlir_uplift_commit
 
+def fetch_via_mirror(repo_name, fetch_fn):
+    """
+    Run fetch_fn (origin pull / fetch) after updating the shared mirror the clone borrows from, if any.
+    """
+    clone_strategy.prepare_fetch(repo_name, repo_name, REPOS_SSH[repo_name])
+    fetch_fn()
+
 def pull_or_clone_repo(repo_name, branch='main'):
     """
-    Pull or clone the repository if it doesn't exist.
+    Pull or clone the repository if it doesn't exist, and check out branch.
+    The pull happens at most once per run (see repo_session.py), and never with --offline.
     """
     if not os.path.exists(repo_name):
+        if repo_session.offline:
+            raise SystemExit(f"Error: {repo_name} is not cloned and --offline was given")
         print(f"Cloning {repo_name}...")
-        git.Repo.clone_from(REPOS_SSH[repo_name], repo_name)
-        repo = git.Repo(repo_name)
+        repo_session.sync_once(repo_name, lambda: clone_strategy.clone(REPOS_SSH[repo_name], repo_name, repo_name))
+        repo = repo_session.get_repo(repo_name)
         if branch != 'main':
             try:
                 repo.git.checkout(branch)
             except git.exc.GitCommandError:
                 print(f"Branch '{branch}' doesn't exist in {repo_name}, staying on default branch")
     else:
-        repo = git.Repo(repo_name)
+        repo = repo_session.get_repo(repo_name)
         try:
             repo.git.checkout(branch)  # Ensure we are on the specified branch
-            print(f"Pulling {repo_name} on branch {branch}...")
-            repo.remotes.origin.pull()
+            if not repo_session.offline and not repo_session.is_synced(repo_name):
+                print(f"Pulling {repo_name} on branch {branch}...")
+            repo_session.sync_once(repo_name, lambda: fetch_via_mirror(repo_name, repo.remotes.origin.pull))
         except git.exc.GitCommandError:
             print(f"Branch '{branch}' doesn't exist in {repo_name}, staying on current branch")
 
+def ensure_repo(repo_name):
+    """
+    Make sure a repo is available for read-only queries and return its cached handle.
+    Clones it if missing and fetches it once per run otherwise; never touches the working tree.
+    """
+    if not os.path.exists(repo_name):
+        pull_or_clone_repo(repo_name)
+    else:
+        repo = repo_session.get_repo(repo_name)
+        repo_session.sync_once(repo_name, lambda: fetch_via_mirror(repo_name, repo.remotes.origin.fetch))
+    return repo_session.get_repo(repo_name)
+
 def initialize_repos():
     """
     Ensure tt-mlir and tt-metal repos are present and up to date.
@@ -360,40 +369,103 @@ def initialize_repos():
     for repo in ["tt-mlir", "tt-metal"]:
         pull_or_clone_repo(repo)
 
-def get_commit_range(repo_name, start_commit, end_commit, branch='main'):
+def prefetch_pins(repo_name, rev_ranges):
     """
-    Get a list of commits in the specified range.
+    In a blobless clone, fetch every version of third_party/CMakeLists.txt in rev_ranges with one request
+    instead of one lazy fetch per blob (see clone_strategy.py). Does nothing offline or in full clones.
     """
-    pull_or_clone_repo(repo_name, branch)
-    repo = git.Repo(repo_name)
-    commits = list(repo.iter_commits(f"{start_commit}..{end_commit}"))
+    if repo_session.offline:
+        return
+    count = clone_strategy.prefetch_paths(repo_name, rev_ranges, [pinned_versions.CMAKELISTS_PATH])
+    if count:
+        print(f"Prefetched {count} {repo_name} {pinned_versions.CMAKELISTS_PATH} version(s)")
+
+def get_commit_range(repo_name, start_commit, end_commit):
+    """
+    Get a list of commits in the specified range, as git_log.CommitRecords (newest first).
+    """
+    repo = ensure_repo(repo_name)
+    commits = list(git_log.iter_commits(repo, f"{start_commit}..{end_commit}"))
     return commits
 
-def create_uplift_commit_mappings(fe_commit_range, repo_name, fe_only=False):
+def lookup_indexed_edges(repo_name, commits):
+    """
+    Fetch the already indexed uplift edges for a list of commits in one query.
+    Returns {sha: (curr, prev)}; empty when the uplift index is disabled.
+    """
+    if edge_index is None:
+        return {}
+    return uplift_index.lookup_edges(edge_index, repo_name, (c.hexsha for c in commits))
+
+def get_indexed_edge(indexed_edges, repo_name, commit, extract_fn):
+    """
+    Return (curr, prev) for a commit, only running extract_fn (a diff) when the commit isn't indexed yet.
+    """
+    if commit.hexsha in indexed_edges:
+        return indexed_edges[commit.hexsha]
+    curr, prev = extract_fn(commit)
+    if edge_index is not None:
+        uplift_index.record_edge(edge_index, repo_name, commit.hexsha, curr, prev)
+    return curr, prev
+
+def expand_mlir_uplift(prev, curr, fe_only=False):
+    """
+    Expand one FE -> tt-mlir uplift (prev..curr) into its tt-mlir commits and, unless fe_only,
+    each tt-mlir -> tt-metal uplift among them into its tt-metal commits.
+    Only touches per-thread repo handles, so it can run in a worker thread.
+    Returns (mlir_commit_range, {mlir_sha: metal_commit_range})
+    """
+    mlir_commit_range = get_commit_range("tt-mlir", prev + "^", curr)
+    metal_ranges = {}
+    
+    # recursively find metal uplift commits from mlir commits (only if not fe_only)
+    if not fe_only:
+        mlir_edges = lookup_indexed_edges("tt-mlir", mlir_commit_range)
+        for mlir_commit in mlir_commit_range:
+            metal_commit_curr,metal_commit_prev = get_indexed_edge(mlir_edges, "tt-mlir", mlir_commit, get_metal_change_from_metal_uplift_commit)
+            if metal_commit_prev and metal_commit_curr:
+                # Store the uplifted metal commit range
+                metal_ranges[mlir_commit.hexsha] = get_commit_range("tt-metal", metal_commit_prev + "^", metal_commit_curr)
+    return mlir_commit_range, metal_ranges
+
+def create_uplift_commit_mappings(fe_commit_range, repo_name, fe_only=False, jobs=1):
     """
     Expand tt-mlir uplift commits into corresponding frontend commits.
     Then recurisvely expand tt-mlir commits into tt-metal commits (unless fe_only is True).
+    With jobs > 1 the per-FE-uplift expansions run in a thread pool; results are merged in FE commit order.
     """
+    start_time = time.perf_counter()
     
+    # Identify FE uplifts up front (cheap tree lookups on the FE repo handle, which stays on this thread)
+    fe_uplifts = []
+    fe_edges = lookup_indexed_edges(repo_name, fe_commit_range)
     for commit in fe_commit_range:
         _commit:git.Commit = commit
         if is_mlir_uplift_commit(_commit):
-            curr,prev = get_mlir_change_from_mlir_uplift_commit(_commit, repo_name)
+            curr,prev = get_indexed_edge(fe_edges, repo_name, _commit, lambda c: get_mlir_change_from_mlir_uplift_commit(c, repo_name))
             if curr and prev:
-                # Store the uplifted MLIR commit range
-                mlir_commit_range = get_commit_range("tt-mlir", prev + "^", curr)
-                mlir2fe_uplift_commits[_commit.hexsha] = mlir_commit_range
-                
-                # recursively find metal uplift commits from mlir commits (only if not fe_only)
-                if not fe_only:
-                    for mlir_commit in mlir_commit_range:
-                        metal_commit_curr,metal_commit_prev = get_metal_change_from_metal_uplift_commit(mlir_commit)
-                        if metal_commit_prev and metal_commit_curr:
-                            # Store the uplifted metal commit range
-                            metal2mlir_uplift_commits[mlir_commit.hexsha] = get_commit_range("tt-metal", metal_commit_prev + "^", metal_commit_curr)
-                
+                fe_uplifts.append((_commit, prev, curr))
                 # print(f"Identified uplifted MLIR commit range: {prev} -> {curr} for commit {_commit.hexsha}")        
     
+    # In a blobless clone, fetch every tt-mlir CMakeLists.txt version the expansion reads in one request
+    prefetch_pins("tt-mlir", [f"{prev}^^..{curr}" for _, prev, curr in fe_uplifts])
+    
+    expand = lambda uplift: expand_mlir_uplift(uplift[1], uplift[2], fe_only)
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            expansions = list(pool.map(expand, fe_uplifts))
+    else:
+        expansions = [expand(uplift) for uplift in fe_uplifts]
+    
+    for (fe_commit, _, _), (mlir_commit_range, metal_ranges) in zip(fe_uplifts, expansions):
+        # Store the uplifted MLIR commit range
+        mlir2fe_uplift_commits[fe_commit.hexsha] = mlir_commit_range
+        metal2mlir_uplift_commits.update(metal_ranges)
+    
+    if edge_index is not None:
+        edge_index.commit()
+    pinned_versions.flush_cache()
+    print(f"Expanded {len(fe_uplifts)} FE uplift commit(s) in {time.perf_counter() - start_time:.2f}s (jobs={jobs})")
     # pprint(mlir2fe_uplift_commits)
     # pprint(metal2mlir_uplift_commits)
     # return mlir2fe_uplift_commits
@@ -472,18 +544,133 @@ def update_cmakelists_version(cmakelists_path, var_name, new_hash):
     """
     Update the given variable in CMakeLists.txt to the new hash.
     """
-    import re
+    update_cmakelists_versions(cmakelists_path, {var_name: new_hash})
+
+def update_cmakelists_versions(cmakelists_path, pins):
+    """
+    Update every {var_name: new_hash} of pins in CMakeLists.txt, reading and writing the file once.
+    """
     with open(cmakelists_path, 'r') as f:
-        lines = f.readlines()
-    pattern = re.compile(rf'set\({var_name} ".*"\)')
-    new_line = f'set({var_name} "{new_hash}")\n'
-    for i, line in enumerate(lines):
-        if pattern.match(line):
-            lines[i] = new_line
+        text = f.read()
     with open(cmakelists_path, 'w') as f:
-        f.writelines(lines)
+        f.write(pinned_versions.set_cmake_versions(text, pins))
+
+def pinned_tree_changes(repo, commit_hexsha, cmake_pins, gitlink_pins=None, base_tree=None):
+    """
+    Work out which entries of commit_hexsha's tree change when its pins are rewritten.
+    cmake_pins: {var_name: hash} for set(TT_*_VERSION ...) in third_party/CMakeLists.txt.
+    gitlink_pins: {path: hash} for submodule gitlinks; only applied where the path already is a gitlink.
+    base_tree: tree to apply the changes to instead of the commit's own (e.g. from plan_hunk_placement);
+    the pin files are still read from the commit.
+    Returns (tree_hexsha, [(path, mode, content)]) where content is the new file data, or the new commit
+    hash for a gitlink.
+    """
+    commit = repo.commit(commit_hexsha)
+    changes = []
+    entry = pinned_versions.get_tree_entry(commit, pinned_versions.CMAKELISTS_PATH)
+    if entry and cmake_pins:
+        mode, blob_hexsha = entry
+        text = tree_edit.read_object(repo, blob_hexsha).decode()
+        new_text = pinned_versions.set_cmake_versions(text, cmake_pins)
+        if new_text != text:
+            changes.append((pinned_versions.CMAKELISTS_PATH, mode, new_text.encode()))
+    for path, new_hash in (gitlink_pins or {}).items():
+        entry = pinned_versions.get_tree_entry(commit, path)
+        if entry and entry[0] == pinned_versions.GITLINK_MODE and entry[1] != new_hash:
+            changes.append((path, pinned_versions.GITLINK_MODE, new_hash))
+    return base_tree or commit.tree.hexsha, changes
+
+def rewrite_pinned_tree(repo, commit_hexsha, cmake_pins, gitlink_pins=None, base_tree=None):
+    """
+    Return the hexsha of commit_hexsha's tree with pins rewritten, built in the object database only.
+    See pinned_tree_changes for the arguments.
+    """
+    tree_hexsha, changes = pinned_tree_changes(repo, commit_hexsha, cmake_pins, gitlink_pins, base_tree)
+    for path, mode, content in changes:
+        if mode != pinned_versions.GITLINK_MODE:
+            content = tree_edit.write_blob(repo, content)
+        tree_hexsha = tree_edit.replace_entry(repo, tree_hexsha, path, mode, content)
+    return tree_hexsha
+
+def warn_if_checked_out(repo, branch):
+    if not repo.head.is_detached and repo.active_branch.name == branch:
+        print(f"Warning: '{branch}' is checked out in {repo.working_dir}; its working tree no longer matches the branch")
+
+def update_branch_ref(repo, branch, hexsha):
+    """
+    Point branch at hexsha without checking anything out.
+    """
+    warn_if_checked_out(repo, branch)
+    repo.git.update_ref(f"refs/heads/{branch}", hexsha)
+
+def metal_uplift_groups(linear_history):
+    """
+    Each MLIR commit that is flattened into metal sub-entries, once, with its metal commits in order:
+    [(mlir_commit, [metal_commit, ...])].
+    """
+    groups = {}
+    for _, mlir_commit, metal_commit in linear_history:
+        if mlir_commit is not None and metal_commit is not None:
+            metals = groups.setdefault(mlir_commit.hexsha, (mlir_commit, []))[1]
+            if metal_commit not in metals:
+                metals.append(metal_commit)
+    return list(groups.values())
+
+def oracle_accept(repo, oracle):
+    """
+    plan_hunk_placement accept callback asking a patch_oracle.PatchOracle about the entry's tree with its
+    pins rewritten as the flattened branch will have them.
+    """
+    lock = threading.Lock()
 
-def create_flattened_mlir_branch(linear_history, mlir_repo_path, base_branch="main", new_branch="jzx/uplift_tree"):
+    def accept(mlir_commit, metal_commits, position, hunk, tree):
+        pins = {'TT_MLIR_VERSION': mlir_commit.hexsha, 'TT_METAL_VERSION': metal_commits[position].hexsha}
+        with lock:
+            probe_tree = rewrite_pinned_tree(repo, mlir_commit.hexsha, pins, base_tree=tree)
+        env = {"PROBE_MLIR": mlir_commit.hexsha, "PROBE_METAL": metal_commits[position].hexsha,
+               "PROBE_POSITION": str(position + 1), "PROBE_POSITIONS": str(len(metal_commits)), "PROBE_PATH": hunk[0]}
+        return oracle.evaluate(probe_tree, hunk[1], env)
+    return accept
+
+def plan_hunk_placement(linear_history, mlir_repo_path, accept=None, jobs=1):
+    """
+    Spread the fix-up hunks of every MLIR metal uplift commit over its metal sub-entries (see
+    patch_placement.py) instead of giving every sub-entry the whole uplift, and print where each hunk went.
+    accept(mlir_commit, metal_commits, position, hunk, tree) can veto a position (None: clean application only);
+    jobs > 1 calls it for that many positions of a hunk at once (see oracle_accept).
+    Returns {(orig_mlir_hash, orig_metal_hash): tree} for create_flattened_mlir_branch's entry_trees.
+    """
+    repo = git.Repo(mlir_repo_path)
+    patcher = patch_placement.TreePatcher(repo)
+    trees = {}
+    for mlir_commit, metal_commits in metal_uplift_groups(linear_history):
+        hunks = patch_placement.commit_hunks(repo, mlir_commit.hexsha)
+        if len(metal_commits) < 2 or not hunks:
+            continue
+        base_tree = repo.commit(f"{mlir_commit.hexsha}^").tree.hexsha
+        accept_hunk = None
+        if accept:
+            accept_hunk = lambda position, index, tree: accept(mlir_commit, metal_commits, position, hunks[index], tree)
+        positions = patch_placement.place_hunks(patcher, base_tree, hunks, len(metal_commits), accept_hunk, jobs)
+        placed = patch_placement.entry_trees(patcher, base_tree, mlir_commit.tree.hexsha, hunks, positions, len(metal_commits))
+        for metal_commit, tree in zip(metal_commits, placed):
+            trees[(mlir_commit.hexsha, metal_commit.hexsha)] = tree
+        print(f"Hunk placement for {mlir_commit.hexsha[:8]} {mlir_commit.message.splitlines()[0][:60]} "
+              f"({len(hunks)} hunks over {len(metal_commits)} metal commits):")
+        for (path, patch), position in zip(hunks, positions):
+            print(f"  {patch_placement.describe_hunk(path, patch):<60} -> {position + 1}/{len(metal_commits)} metal {metal_commits[position].hexsha[:8]}")
+    return trees
+
+def create_flattened_mlir_branch(linear_history, mlir_repo_path, base_branch="main", new_branch="jzx/uplift_tree", writer="worktree", entry_trees=None):
+    """
+    entry_trees: {(orig_mlir_hash, orig_metal_hash): tree} overriding the tree an entry starts from
+    (see plan_hunk_placement); other entries use their MLIR commit's tree.
+    """
+    if writer == "plumbing":
+        return create_flattened_mlir_branch_plumbing(linear_history, mlir_repo_path, base_branch, new_branch, entry_trees)
+    if writer == "fast-import":
+        return create_flattened_mlir_branch_fast_import(linear_history, mlir_repo_path, base_branch, new_branch, entry_trees)
+    entry_trees = entry_trees or {}
     repo = git.Repo(mlir_repo_path)
     repo.git.checkout(base_branch)
     # Delete branch if exists
@@ -495,29 +682,86 @@ def create_flattened_mlir_branch(linear_history, mlir_repo_path, base_branch="ma
     for _, mlir_commit, metal_commit in linear_history:
         if mlir_commit is None:
             continue
-        repo.git.checkout(mlir_commit.hexsha, '--', '.')
+        key = (mlir_commit.hexsha, metal_commit.hexsha if metal_commit else None)
         # Update TT_METAL_VERSION if this is a metal uplift
+        pins = {'TT_MLIR_VERSION': mlir_commit.hexsha}
         if metal_commit:
-            update_cmakelists_version(cmakelists_path, 'TT_METAL_VERSION', metal_commit.hexsha)
-        update_cmakelists_version(cmakelists_path, 'TT_MLIR_VERSION', mlir_commit.hexsha)
+            pins['TT_METAL_VERSION'] = metal_commit.hexsha
+        expected_tree = None
+        if key in entry_trees:
+            # The placed tree starts from the uplift's parent, and CMakeLists.txt is never part of the hunks:
+            # rewrite the pins from the uplift commit's own CMakeLists.txt, as the plumbing writer does, then
+            # set index and working tree to exactly that tree, removing files it doesn't have
+            expected_tree = rewrite_pinned_tree(repo, mlir_commit.hexsha, pins, base_tree=entry_trees[key])
+            repo.git.read_tree('--reset', '-u', expected_tree)
+        else:
+            repo.git.checkout(mlir_commit.hexsha, '--', '.')
+            update_cmakelists_versions(cmakelists_path, pins)
         repo.git.add(A=True)
-        # Compose commit message
-        msg = f"orig_fe=None | orig_mlir={mlir_commit.hexsha[:8]} | orig_metal={metal_commit.hexsha[:8] if metal_commit else 'None'}"
-        msg_body = f"\n\n[MLIR:{mlir_commit.hexsha[:8]}] {mlir_commit.message.splitlines()[0]}"
+        msg = flattened_commit_message(None, mlir_commit, metal_commit)
+        new_commit = repo.index.commit(msg, author=mlir_commit.author, committer=mlir_commit.committer, author_date=mlir_commit.authored_datetime, commit_date=mlir_commit.committed_datetime)
+        if expected_tree and new_commit.tree.hexsha != expected_tree:
+            print(f"Warning: {new_commit.hexsha[:8]} ({mlir_commit.hexsha[:8]} + metal {metal_commit.hexsha[:8]}) doesn't match "
+                  f"the planned tree {expected_tree[:8]}; untracked files in {mlir_repo_path}?")
+        mlir_map[key] = new_commit.hexsha
+    return mlir_map
+
+def create_flattened_mlir_branch_plumbing(linear_history, mlir_repo_path, base_branch="main", new_branch="jzx/uplift_tree", entry_trees=None):
+    """
+    Same commits as create_flattened_mlir_branch, built purely in the object database:
+    no checkout, no index and no working-tree I/O. new_branch is only moved once, at the end.
+    """
+    repo = git.Repo(mlir_repo_path)
+    parent = repo.commit(base_branch).hexsha
+    mlir_map = {}  # (orig_mlir_hash, orig_metal_hash) -> new_commit.hexsha
+    for _, mlir_commit, metal_commit in linear_history:
+        if mlir_commit is None:
+            continue
+        # Update TT_METAL_VERSION if this is a metal uplift
+        cmake_pins = {'TT_MLIR_VERSION': mlir_commit.hexsha}
         if metal_commit:
-            msg_body += f"\n[METAL:{metal_commit.hexsha[:8]}] {metal_commit.message.splitlines()[0]}"
-        new_commit = repo.index.commit(msg + msg_body, author=mlir_commit.author, committer=mlir_commit.committer, author_date=mlir_commit.authored_datetime, commit_date=mlir_commit.committed_datetime)
-        mlir_map[(mlir_commit.hexsha, metal_commit.hexsha if metal_commit else None)] = new_commit.hexsha
+            cmake_pins['TT_METAL_VERSION'] = metal_commit.hexsha
+        key = (mlir_commit.hexsha, metal_commit.hexsha if metal_commit else None)
+        tree = rewrite_pinned_tree(repo, mlir_commit.hexsha, cmake_pins, base_tree=(entry_trees or {}).get(key))
+        msg = flattened_commit_message(None, mlir_commit, metal_commit)
+        parent = tree_edit.write_commit(repo, tree, [parent], msg, author=mlir_commit.author, committer=mlir_commit.committer, author_date=mlir_commit.authored_datetime, commit_date=mlir_commit.committed_datetime)
+        mlir_map[key] = parent
+    update_branch_ref(repo, new_branch, parent)
     return mlir_map
 
 
-def apply_patch_if_needed(repo, fe_commit, mlir_commit, metal_commit, patch_mappings):
+def create_flattened_mlir_branch_fast_import(linear_history, mlir_repo_path, base_branch="main", new_branch="jzx/uplift_tree", entry_trees=None):
     """
-    Apply patches if this commit matches any of the specified MLIR commits.
+    Same commits as create_flattened_mlir_branch, written as one `git fast-import` stream.
+    Each commit reuses the original tree and only overrides third_party/CMakeLists.txt inline.
+    """
+    repo = git.Repo(mlir_repo_path)
+    warn_if_checked_out(repo, new_branch)
+    writer = fast_import.FastImportWriter(repo, new_branch, repo.commit(base_branch).hexsha)
+    mlir_marks = {}  # (orig_mlir_hash, orig_metal_hash) -> fast-import mark
+    for _, mlir_commit, metal_commit in linear_history:
+        if mlir_commit is None:
+            continue
+        # Update TT_METAL_VERSION if this is a metal uplift
+        cmake_pins = {'TT_MLIR_VERSION': mlir_commit.hexsha}
+        if metal_commit:
+            cmake_pins['TT_METAL_VERSION'] = metal_commit.hexsha
+        key = (mlir_commit.hexsha, metal_commit.hexsha if metal_commit else None)
+        tree, changes = pinned_tree_changes(repo, mlir_commit.hexsha, cmake_pins, base_tree=(entry_trees or {}).get(key))
+        msg = flattened_commit_message(None, mlir_commit, metal_commit)
+        mlir_marks[key] = writer.commit(
+            tree, changes, msg, author=mlir_commit.author, committer=mlir_commit.committer, author_date=mlir_commit.authored_datetime, commit_date=mlir_commit.committed_datetime)
+    marks = writer.close()
+    return {key: marks[mark] for key, mark in mlir_marks.items()}
+
+
+def find_matching_patches(mlir_commit, patch_mappings):
+    """
+    Return the patch files to apply at this MLIR commit.
     patch_mappings: dict of {mlir_commit_hash: patch_file_path}
     """
     if not patch_mappings or not mlir_commit:
-        return
+        return []
     
     mlir_hash = mlir_commit.hexsha
     # Also check for partial hash matches (in case user provided short hash)
@@ -525,9 +769,15 @@ def apply_patch_if_needed(repo, fe_commit, mlir_commit, metal_commit, patch_mapp
     for patch_hash, patch_path in patch_mappings.items():
         if mlir_hash.startswith(patch_hash) or patch_hash.startswith(mlir_hash[:8]):
             matching_patches.append(patch_path)
-    
-    for patch_path in matching_patches:
-        print(f"Applying patch {patch_path} for MLIR commit {mlir_hash[:8]}")
+    return matching_patches
+
+def apply_patch_if_needed(repo, fe_commit, mlir_commit, metal_commit, patch_mappings):
+    """
+    Apply patches if this commit matches any of the specified MLIR commits.
+    patch_mappings: dict of {mlir_commit_hash: patch_file_path}
+    """
+    for patch_path in find_matching_patches(mlir_commit, patch_mappings):
+        print(f"Applying patch {patch_path} for MLIR commit {mlir_commit.hexsha[:8]}")
         try:
             # Apply the patch
             repo.git.apply(patch_path)
@@ -535,7 +785,24 @@ def apply_patch_if_needed(repo, fe_commit, mlir_commit, metal_commit, patch_mapp
         except git.exc.GitCommandError as e:
             print(f"Warning: Failed to apply patch {patch_path}: {e}")
 
-def create_flattened_fe_branch(linear_history, fe_repo_path, mlir_map, base_branch="main", new_branch="jzx/uplift_tree", patch_mappings=None):
+def apply_patches_to_tree(repo, tree, mlir_commit, patch_mappings):
+    """
+    Object-database counterpart of apply_patch_if_needed: returns the (possibly) patched tree hexsha.
+    """
+    for patch_path in find_matching_patches(mlir_commit, patch_mappings):
+        print(f"Applying patch {patch_path} for MLIR commit {mlir_commit.hexsha[:8]}")
+        try:
+            tree = tree_edit.apply_patch_to_tree(repo, tree, patch_path)
+            print(f"Successfully applied patch {patch_path}")
+        except git.exc.GitCommandError as e:
+            print(f"Warning: Failed to apply patch {patch_path}: {e}")
+    return tree
+
+def create_flattened_fe_branch(linear_history, fe_repo_path, mlir_map, base_branch="main", new_branch="jzx/uplift_tree", patch_mappings=None, writer="worktree"):
+    if writer == "plumbing":
+        return create_flattened_fe_branch_plumbing(linear_history, fe_repo_path, mlir_map, base_branch, new_branch, patch_mappings)
+    if writer == "fast-import":
+        return create_flattened_fe_branch_fast_import(linear_history, fe_repo_path, mlir_map, base_branch, new_branch, patch_mappings)
     repo = git.Repo(fe_repo_path)
     repo.git.checkout(base_branch)
     # Delete branch if exists. for clean reset logic
@@ -555,13 +822,97 @@ def create_flattened_fe_branch(linear_history, fe_repo_path, mlir_map, base_bran
         apply_patch_if_needed(repo, fe_commit, mlir_commit, metal_commit, patch_mappings)
         
         repo.git.add(A=True)
-        msg = f"orig_fe={fe_commit.hexsha[:8]} | orig_mlir={mlir_commit.hexsha[:8] if mlir_commit else 'None'} | orig_metal={metal_commit.hexsha[:8] if metal_commit else 'None'}"
-        msg_body = f"\n\n[FE:{fe_commit.hexsha[:8]}] {fe_commit.message.splitlines()[0]}"
+        msg = flattened_commit_message(fe_commit, mlir_commit, metal_commit)
+        repo.index.commit(msg, author=fe_commit.author, committer=fe_commit.committer, author_date=fe_commit.authored_datetime, commit_date=fe_commit.committed_datetime)
+
+def create_flattened_fe_branch_plumbing(linear_history, fe_repo_path, mlir_map, base_branch="main", new_branch="jzx/uplift_tree", patch_mappings=None):
+    """
+    Same commits as create_flattened_fe_branch, built purely in the object database.
+    Also handles tt-forge-fe, whose tt-mlir pin is the third_party/tt-mlir gitlink.
+    """
+    repo = git.Repo(fe_repo_path)
+    parent = repo.commit(base_branch).hexsha
+    for fe_commit, mlir_commit, metal_commit in linear_history:
+        tree = repo.commit(fe_commit.hexsha).tree.hexsha
+        # Update TT_MLIR_VERSION to the new MLIR commit hash from the flattened branch
         if mlir_commit:
-            msg_body += f"\n[MLIR:{mlir_commit.hexsha[:8]}] {mlir_commit.message.splitlines()[0]}"
-        if metal_commit:
-            msg_body += f"\n[METAL:{metal_commit.hexsha[:8]}] {metal_commit.message.splitlines()[0]}"
-        repo.index.commit(msg + msg_body, author=fe_commit.author, committer=fe_commit.committer, author_date=fe_commit.authored_datetime, commit_date=fe_commit.committed_datetime)
+            new_mlir_hash = mlir_map.get((mlir_commit.hexsha, metal_commit.hexsha if metal_commit else None))
+            if new_mlir_hash:
+                tree = rewrite_pinned_tree(repo, fe_commit.hexsha, {'TT_MLIR_VERSION': new_mlir_hash}, {pinned_versions.MLIR_SUBMODULE_PATH: new_mlir_hash})
+        
+        # Apply patch if needed for this MLIR commit
+        tree = apply_patches_to_tree(repo, tree, mlir_commit, patch_mappings)
+        
+        msg = flattened_commit_message(fe_commit, mlir_commit, metal_commit)
+        parent = tree_edit.write_commit(repo, tree, [parent], msg, author=fe_commit.author, committer=fe_commit.committer, author_date=fe_commit.authored_datetime, commit_date=fe_commit.committed_datetime)
+    update_branch_ref(repo, new_branch, parent)
+
+
+def create_flattened_fe_branch_fast_import(linear_history, fe_repo_path, mlir_map, base_branch="main", new_branch="jzx/uplift_tree", patch_mappings=None):
+    """
+    Same commits as create_flattened_fe_branch, written as one `git fast-import` stream.
+    Entries that get a patch applied are built with the object-database helpers first and passed as a whole tree.
+    """
+    repo = git.Repo(fe_repo_path)
+    warn_if_checked_out(repo, new_branch)
+    writer = fast_import.FastImportWriter(repo, new_branch, repo.commit(base_branch).hexsha)
+    for fe_commit, mlir_commit, metal_commit in linear_history:
+        cmake_pins, gitlink_pins = {}, {}
+        # Update TT_MLIR_VERSION to the new MLIR commit hash from the flattened branch
+        if mlir_commit:
+            new_mlir_hash = mlir_map.get((mlir_commit.hexsha, metal_commit.hexsha if metal_commit else None))
+            if new_mlir_hash:
+                cmake_pins = {'TT_MLIR_VERSION': new_mlir_hash}
+                gitlink_pins = {pinned_versions.MLIR_SUBMODULE_PATH: new_mlir_hash}
+
+        if find_matching_patches(mlir_commit, patch_mappings):
+            tree = rewrite_pinned_tree(repo, fe_commit.hexsha, cmake_pins, gitlink_pins)
+            tree, changes = apply_patches_to_tree(repo, tree, mlir_commit, patch_mappings), []
+        else:
+            tree, changes = pinned_tree_changes(repo, fe_commit.hexsha, cmake_pins, gitlink_pins)
+
+        msg = flattened_commit_message(fe_commit, mlir_commit, metal_commit)
+        writer.commit(tree, changes, msg, author=fe_commit.author, committer=fe_commit.committer, author_date=fe_commit.authored_datetime, commit_date=fe_commit.committed_datetime)
+    writer.close()
+
+
+def resolve_short_hash(repo, short_hash):
+    try:
+        return repo.git.rev_parse("--verify", "--quiet", f"{short_hash}^{{commit}}")
+    except git.exc.GitCommandError:
+        return None
+
+def find_incremental_base(fe_repo_name, start_commit, end_commit, branch="jzx/uplift_tree"):
+    """
+    Work out where existing flattened branches left off, so only newer FE commits need flattening.
+    Returns (last_fe_hexsha, fe_tip_hexsha, mlir_tip_hexsha), or None (with the reason printed)
+    when the branches have to be rebuilt from scratch.
+    """
+    fe_repo = repo_session.get_repo(fe_repo_name)
+    mlir_repo = repo_session.get_repo("tt-mlir")
+    if branch not in fe_repo.heads or branch not in mlir_repo.heads:
+        print(f"No existing '{branch}' branch in {fe_repo_name} and tt-mlir, rebuilding from scratch")
+        return None
+    fe_tip = fe_repo.commit(branch)
+    mlir_tip = mlir_repo.commit(branch)
+
+    header = parse_flattened_header(fe_tip.message)
+    last_fe = resolve_short_hash(fe_repo, header[0]) if header and header[0] else None
+    if last_fe is None:
+        print(f"Can't find the original FE commit of {fe_repo_name}:{branch} tip {fe_tip.hexsha[:8]}, rebuilding from scratch")
+        return None
+    if not fe_repo.is_ancestor(last_fe, end_commit) or not fe_repo.is_ancestor(start_commit, last_fe):
+        print(f"Last flattened FE commit {last_fe[:8]} is outside {start_commit}..{end_commit}, rebuilding from scratch")
+        return None
+
+    # tt-mlir's branch is shared by all FEs: only extend it if it's still the one this FE branch points at
+    last_fe_mlir = next(git_log.iter_commits(fe_repo, branch, "-1", "--grep=orig_mlir=[0-9a-f]"), None)
+    fe_pair = parse_flattened_header(last_fe_mlir.message)[1:] if last_fe_mlir else None
+    mlir_header = parse_flattened_header(mlir_tip.message)
+    if fe_pair is None or mlir_header is None or mlir_header[1:] != fe_pair:
+        print(f"tt-mlir:{branch} doesn't continue {fe_repo_name}:{branch}, rebuilding from scratch")
+        return None
+    return last_fe, fe_tip.hexsha, mlir_tip.hexsha
 
 
 def print_flattened_uplift_table(fe_repo_path, branch_name="jzx/uplift_tree"):
@@ -570,9 +921,8 @@ def print_flattened_uplift_table(fe_repo_path, branch_name="jzx/uplift_tree"):
     The commit message column is prioritized: [METAL] > [MLIR] > [FE].
     Color the row based on which message is present (CYAN for METAL, YELLOW for MLIR, GREEN for FE).
     """
-    import re
     repo = git.Repo(fe_repo_path)
-    commits = list(repo.iter_commits(branch_name))
+    commits = git_log.iter_commits(repo, branch_name)
     CYAN = '\033[1;36m'
     YELLOW = '\033[1;33m'
     GREEN = '\033[1;32m'
@@ -581,13 +931,11 @@ def print_flattened_uplift_table(fe_repo_path, branch_name="jzx/uplift_tree"):
     print(f"{'NEW_FE':10} | {'ORIG_FE':10} | {'ORIG_MLIR':10} | {'ORIG_METAL':10} | MESSAGE")
     print("-" * 120)
     for commit in commits:
-        # Parse commit message for orig_fe, orig_mlir, orig_metal
-        m = re.search(r"orig_fe=([0-9a-f]+) \| orig_mlir=([0-9a-f]+|None) \| orig_metal=([0-9a-f]+|None)", commit.message)
-        if m:
-            orig_fe, orig_mlir, orig_metal = m.groups()
-        else:
-            orig_fe = orig_mlir = orig_metal = "?"
+        # Parse commit message for orig_fe, orig_mlir, orig_metal; stop at the first commit below the flattened range
+        header = parse_flattened_header(commit.message)
+        if header is None:
             break
+        orig_fe, orig_mlir, orig_metal = (str(v) for v in header)
         # Extract [METAL], [MLIR], [FE] messages in order of priority
         msg = ""
         color = RESET
@@ -613,7 +961,6 @@ def prompt_and_force_push(fe_repo, mlir_repo, branch="jzx/uplift_tree"):
     """
     Prompt the user to confirm force-pushing both FE and MLIR uplift branches to remote.
     """
-    import sys
     prompt = f"\nWARNING: This will force-push local branches '{branch}' to origin for both {fe_repo} and {mlir_repo}. This will overwrite remote branches if they exist.\nProceed? [y/N]: "
     resp = input(prompt)
     if resp.lower() == 'y':
@@ -635,9 +982,27 @@ def main():
     parser.add_argument("--fe-branch", default="main", help="FE branch to use as base for commit range and new branch creation (default: main)")
     parser.add_argument("--patch", action="append", nargs=2, metavar=("MLIR_COMMIT", "PATCH_FILE"), 
                         help="Apply patch file at specific MLIR commit. Can be used multiple times. Format: --patch <mlir_commit_hash> <patch_file_path>")
+    parser.add_argument("--place-hunks", action="store_true", help="Split each MLIR metal uplift's fix-ups into hunks and place each at the earliest metal sub-commit where it applies, instead of at all of them (report printed)")
+    parser.add_argument("--patch-oracle", metavar="CMD", help="With hunk placement (implied): shell command run in a checkout of each candidate entry; exit 0 accepts the hunk there, else it moves later. Gets $PROBE_TREE, $PROBE_MLIR, $PROBE_METAL, $PROBE_POSITION, $PROBE_PATH. Verdicts are cached")
+    parser.add_argument("--oracle-jobs", type=int, default=1, help="Run up to N --patch-oracle probes at once, each in its own worktree (default: 1)")
+    parser.add_argument("--oracle-cache", help="Path of the patch oracle verdict cache (default: <cache dir>/patch_oracle.sqlite)")
+    parser.add_argument("--writer", choices=["worktree", "plumbing", "fast-import"], default="worktree",
+                        help="How to build the flattened branches: 'worktree' checks out and commits each entry, 'plumbing' writes objects directly without touching the checkout, 'fast-import' streams each branch through one git fast-import process (default: worktree)")
+    parser.add_argument("--incremental", action="store_true", help="Extend existing jzx/uplift_tree branches with the FE commits after their last flattened one instead of rebuilding them")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Expand FE uplift commits in parallel with N worker threads (default: 1)")
+    parser.add_argument("--clone", choices=clone_strategy.STRATEGIES, help="How to clone missing repos: full, blobless, treeless or partial (treeless tt-metal, blobless others). Default: $INTEGRATION_TOOLS_CLONE or full")
+    parser.add_argument("--sparse", action="store_true", default=None, help="Limit fresh clones' checkouts to third_party/ (needs --writer plumbing or fast-import)")
+    parser.add_argument("--mirror-dir", help="Clone through shared bare mirrors in this directory (git alternates), updated once per run. Default: $INTEGRATION_TOOLS_MIRRORS, or no mirrors")
+    parser.add_argument("--offline", action="store_true", help="Don't clone, fetch or pull anything; use the existing local clones as-is")
+    parser.add_argument("--no-index", action="store_true", help="Don't read or update the persistent uplift index and pinned version cache (always re-diff every commit)")
+    parser.add_argument("--index-path", help="Path of the persistent uplift index (default: <cache dir>/uplift_index.sqlite)")
     parser.add_argument("--current-mlir-uplift", help="GitHub PR URL for a current (unmerged) tt-mlir uplift to simulate (e.g., https://github.com/tenstorrent/tt-mlir/pull/5394)")
     args = parser.parse_args()
     
+    if args.offline:
+        repo_session.set_offline()
+    clone_strategy.configure(args.clone, args.sparse, args.mirror_dir)
+    
     # Handle simulated uplift mode
     if args.current_mlir_uplift:
         if not args.start_commit:
@@ -674,9 +1039,28 @@ def main():
             print(f"  - {mlir_hash} -> {patch_file}")
     
     initialize_repos()
+    pull_or_clone_repo(args.frontend, args.fe_branch)
+    if args.writer == "worktree" and any(clone_strategy.is_sparse(r) for r in ['tt-mlir', args.frontend]):
+        print("Error: --writer worktree needs full checkouts of tt-mlir and the FE; use --writer plumbing or fast-import with sparse clones")
+        return 1
+    
+    global edge_index
+    if not args.no_index:
+        edge_index = uplift_index.open_index(args.index_path)
+        pinned_versions.open_cache()
     
-    commits = get_commit_range(args.frontend, args.start_commit, args.end_commit, args.fe_branch)
-    create_uplift_commit_mappings(commits, args.frontend, fe_only=args.fe_only)
+    start_commit, fe_base, mlir_base = args.start_commit, args.fe_branch, 'main'
+    incremental_base = find_incremental_base(args.frontend, args.start_commit, args.end_commit) if args.incremental else None
+    if incremental_base:
+        start_commit, fe_base, mlir_base = incremental_base
+        print(f"Extending existing jzx/uplift_tree after FE commit {start_commit[:8]}")
+    
+    commits = get_commit_range(args.frontend, start_commit, args.end_commit)
+    if incremental_base and not commits:
+        print("jzx/uplift_tree is already up to date")
+        return 0
+    prefetch_pins(args.frontend, [f"{start_commit}^..{args.end_commit}"])
+    create_uplift_commit_mappings(commits, args.frontend, fe_only=args.fe_only, jobs=args.jobs)
     
     # build & print uplift tree for debug/inspection purposes
     tree = build_uplift_tree_with_all_fe(commits)
@@ -693,8 +1077,17 @@ def main():
                 print(f"  - {mlir_commit.hexsha[:8]} | {mlir_commit.message.splitlines()[0][:60]}")
         print()
 
-    mlir_map = create_flattened_mlir_branch(linear_history, 'tt-mlir', base_branch='main')
-    create_flattened_fe_branch(linear_history, args.frontend, mlir_map, base_branch=args.fe_branch, patch_mappings=patch_mappings)
+    entry_trees = None
+    if args.patch_oracle:
+        oracle = patch_oracle.PatchOracle(git.Repo('tt-mlir'), args.patch_oracle, args.oracle_cache)
+        try:
+            entry_trees = plan_hunk_placement(linear_history, 'tt-mlir', oracle_accept(git.Repo('tt-mlir'), oracle), args.oracle_jobs)
+        finally:
+            oracle.close()
+    elif args.place_hunks:
+        entry_trees = plan_hunk_placement(linear_history, 'tt-mlir')
+    mlir_map = create_flattened_mlir_branch(linear_history, 'tt-mlir', base_branch=mlir_base, writer=args.writer, entry_trees=entry_trees)
+    create_flattened_fe_branch(linear_history, args.frontend, mlir_map, base_branch=fe_base, patch_mappings=patch_mappings, writer=args.writer)
     
 
     # Print the flattened uplift table (new FE branch)
@@ -737,4 +1130,6 @@ This situation becomes yet more complicated for multi-patch situations which are
 need to be manually applied to the correct commit in the flattened branch, which is nontrivial to do or find out.
 
 One partial solution - provide --fe-only flag to only unroll MLIR -> FE uplifts, and keep metal uplifts intact.
+Another - --place-hunks splits the MLIR uplift commit into hunks and gives each metal sub-commit only the hunks that apply there
+(see patch_placement.py). Without a build signal that still puts independent fix-ups at A.
 '''
\ No newline at end of file
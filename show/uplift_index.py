@@ -0,0 +1,78 @@
+"""
+Persistent index of uplift edges, keyed by commit SHA.
+
+uplift_history.py has to inspect every FE commit and every tt-mlir commit in a range
+to find which ones bump TT_MLIR_VERSION / TT_METAL_VERSION. Commits are immutable, so
+once a commit has been inspected its answer ("is uplift / before hash / after hash")
+never changes. This module stores those answers in SQLite so that later runs only
+diff commits they have not seen before.
+
+Default location: <cache dir>/uplift_index.sqlite (see cache_paths.py).
+"""
+import os
+import sqlite3
+import threading
+
+from cache_paths import get_cache_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uplift_edges (
+    repo        TEXT NOT NULL,
+    sha         TEXT NOT NULL,
+    is_uplift   INTEGER NOT NULL,
+    before_hash TEXT,
+    after_hash  TEXT,
+    PRIMARY KEY (repo, sha)
+);
+"""
+
+# Keep IN (...) queries comfortably below SQLite's host parameter limit
+LOOKUP_BATCH = 500
+
+# One connection is shared by uplift_history.py's worker threads; serialize access to it
+_lock = threading.Lock()
+
+
+def default_index_path():
+    return os.path.join(get_cache_dir(), "uplift_index.sqlite")
+
+
+def open_index(path=None):
+    """
+    Open (creating if needed) the uplift index database.
+    """
+    conn = sqlite3.connect(path or default_index_path(), check_same_thread=False)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def lookup_edges(conn, repo_name, shas):
+    """
+    Look up already indexed commits.
+    Returns {sha: (after_hash, before_hash)} for every indexed sha; non-uplift commits map to (None, None).
+    """
+    shas = list(shas)
+    edges = {}
+    for i in range(0, len(shas), LOOKUP_BATCH):
+        batch = shas[i:i + LOOKUP_BATCH]
+        placeholders = ",".join("?" * len(batch))
+        with _lock:
+            rows = conn.execute(
+                f"SELECT sha, after_hash, before_hash FROM uplift_edges WHERE repo = ? AND sha IN ({placeholders})",
+                [repo_name, *batch],
+            ).fetchall()
+        for sha, after_hash, before_hash in rows:
+            edges[sha] = (after_hash, before_hash)
+    return edges
+
+
+def record_edge(conn, repo_name, sha, after_hash, before_hash):
+    """
+    Record the result of inspecting a commit. Call conn.commit() once a batch is done.
+    """
+    is_uplift = 1 if (after_hash and before_hash) else 0
+    with _lock:
+        conn.execute(
+            "INSERT OR REPLACE INTO uplift_edges (repo, sha, is_uplift, before_hash, after_hash) VALUES (?, ?, ?, ?, ?)",
+            (repo_name, sha, is_uplift, before_hash, after_hash),
+        )